@@ -5,16 +5,38 @@ Serves data insights, predictions, and analytics
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import pandas as pd
 import numpy as np
+import asyncio
 import json
+import orjson
 import os
+import re
 import sys
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from functools import lru_cache
 import logging
+import time
+from numba import njit, prange
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -26,11 +48,47 @@ from etl.data_processor import DataProcessor
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _json_default(obj):
+    """Serialize pandas scalars that orjson does not handle natively"""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(content: Any) -> bytes:
+    """Encode content with orjson, accepting numpy values and pandas Timestamps"""
+    return orjson.dumps(
+        content,
+        default=_json_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+class PandasJSONResponse(ORJSONResponse):
+    """orjson response that also accepts numpy values and pandas Timestamps"""
+    
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm up models before serving, and stop prediction batchers on shutdown"""
+    _load_latest_models()
+    
+    yield
+    
+    for task in _predict_batchers.values():
+        task.cancel()
+    _predict_batchers.clear()
+    _predict_queues.clear()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Data Science Analytics API",
     description="API for serving data insights, predictions, and analytics",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=PandasJSONResponse,
+    lifespan=lifespan
 )
 
 # Load environment variables
@@ -49,21 +107,238 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies (bulk data, reports)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Initialize components
 ml_models = MLModels()
 data_processor = DataProcessor()
 
-# Load models if they exist
-models_dir = "../models"
-if os.path.exists(models_dir):
+def _load_latest_models(models_dir: str = "../models"):
+    """Load the newest saved models and run a dummy row through each"""
+    if not os.path.exists(models_dir):
+        return
     model_files = [f for f in os.listdir(models_dir) if f.endswith('.joblib')]
-    if model_files:
-        latest_model = sorted(model_files)[-1]
+    if not model_files:
+        return
+    
+    latest_model = sorted(model_files)[-1]
+    try:
+        # Saved models are LZ4-compressed, which joblib cannot memory-map
+        ml_models.load_models(os.path.join(models_dir, latest_model))
+        logger.info(f"Loaded models from {latest_model}")
+    except Exception as e:
+        logger.warning(f"Could not load models: {e}")
+        return
+    
+    # Warm each model so the first request skips lazy initialization
+    for name, metadata in ml_models.model_metadata.items():
         try:
-            ml_models.load_models(os.path.join(models_dir, latest_model))
-            logger.info(f"Loaded models from {latest_model}")
+            dummy = pd.DataFrame(np.zeros((1, len(metadata['features']))), columns=metadata['features'])
+            ml_models.make_prediction(name, dummy)
         except Exception as e:
-            logger.warning(f"Could not load models: {e}")
+            logger.warning(f"Could not warm up model {name}: {e}")
+
+# Cached listing of the data directory: (filename, size_bytes, mtime) per file
+_dir_cache = {'dir': None, 't': 0.0, 'entries': []}
+
+def _list_data(data_dir: str = "../data", ttl: float = 2.0) -> List[Tuple[str, int, float]]:
+    """List the data directory with sizes and mtimes, refreshed at most every ttl seconds"""
+    now = time.monotonic()
+    if _dir_cache['dir'] != data_dir or now - _dir_cache['t'] > ttl:
+        entries = []
+        if os.path.exists(data_dir):
+            with os.scandir(data_dir) as it:
+                for entry in it:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.name, stat.st_size, stat.st_mtime))
+        _dir_cache.update({'dir': data_dir, 't': now, 'entries': entries})
+    return _dir_cache['entries']
+
+def _watch_data_dir(data_dir: str = "../data"):
+    """Invalidate the cached listing as soon as anything in data_dir changes"""
+    if not WATCHDOG_AVAILABLE or not os.path.exists(data_dir):
+        return None
+    
+    class _InvalidateListing(FileSystemEventHandler):
+        def on_any_event(self, event):
+            _dir_cache['t'] = 0.0
+    
+    observer = Observer()
+    observer.schedule(_InvalidateListing(), data_dir)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+data_dir_observer = _watch_data_dir()
+
+# Date columns converted once when a CSV is loaded
+DATE_COLUMNS = ['date', 'datetime']
+
+# Use the multi-threaded pyarrow CSV parser when it is installed
+CSV_ENGINE = 'pyarrow' if PYARROW_AVAILABLE else 'c'
+
+# /data responses with more rows than this are streamed in batches
+STREAM_MIN_ROWS = 256
+STREAM_BATCH_ROWS = 128
+
+# Data files are named {processed|raw}_{source}_{date}
+_FN_RE = re.compile(r'^(processed|raw)_([^_]+)_')
+
+# Rows sampled to infer which CSV columns are numeric
+SCHEMA_SAMPLE_ROWS = 1000
+
+@lru_cache(maxsize=32)
+def _read_csv_header(path: str, mtime: float) -> tuple:
+    """Read only the header row of a CSV file, cached per (path, mtime)"""
+    return tuple(pd.read_csv(path, nrows=0).columns)
+
+@lru_cache(maxsize=32)
+def _fast_row_count(path: str, mtime: float) -> int:
+    """Count the data rows of a CSV file without parsing it, cached per (path, mtime)"""
+    lines = 0
+    last = b''
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            # Quoted fields may hold newlines and blank lines are skipped by the
+            # parser, so only plain files can be counted by their line breaks
+            edge = last + block[:2]
+            if b'"' in block or b'\n\n' in block or b'\n\r\n' in block or b'\n\n' in edge or b'\n\r\n' in edge:
+                first_col = _read_csv_header(path, mtime)[:1]
+                return sum(len(chunk) for chunk in pd.read_csv(path, usecols=list(first_col), chunksize=100_000))
+            lines += block.count(b'\n')
+            last = block[-2:]
+    
+    if last and not last.endswith(b'\n'):
+        lines += 1
+    return max(lines - 1, 0)
+
+@lru_cache(maxsize=32)
+def _read_csv_numeric_columns(path: str, mtime: float) -> tuple:
+    """Return the date and numeric column names of a CSV file, inferred from a sample of rows"""
+    sample = pd.read_csv(path, nrows=SCHEMA_SAMPLE_ROWS)
+    numeric_cols = set(sample.select_dtypes(include=[np.number]).columns)
+    return tuple(col for col in sample.columns if col in DATE_COLUMNS or col in numeric_cols)
+
+@lru_cache(maxsize=32)
+def _load_csv(path: str, mtime: float, nrows: Optional[int] = None, parse_dates: bool = True,
+              usecols: Optional[tuple] = None) -> Tuple[pd.DataFrame, tuple, Optional[str]]:
+    """Load a CSV file, cached per (path, mtime) so unchanged files are parsed once.
+
+    Returns (df, numeric_cols, date_col), with the column lists worked out
+    once per load. Passing nrows reads only that many leading rows and
+    usecols only those columns; parse_dates=False leaves date columns as
+    strings for callers that never look at them. The returned frame is
+    shared between requests and must not be mutated.
+    """
+    date_cols = []
+    if parse_dates:
+        date_cols = [
+            col for col in DATE_COLUMNS
+            if col in _read_csv_header(path, mtime) and (usecols is None or col in usecols)
+        ]
+    
+    # The pyarrow engine cannot stop early, so prefix reads use the C parser
+    engine = CSV_ENGINE if nrows is None else 'c'
+    df = pd.read_csv(
+        path, nrows=nrows, parse_dates=date_cols, engine=engine,
+        usecols=list(usecols) if usecols else None
+    )
+    
+    # Fall back for date columns the parser could not convert (mixed formats)
+    for col in date_cols:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+    
+    numeric_cols = tuple(df.select_dtypes(include=[np.number]).columns)
+    date_col = next((col for col in DATE_COLUMNS if col in df.columns), None)
+    return df, numeric_cols, date_col
+
+@lru_cache(maxsize=32)
+def _read_parquet_columns(path: str, mtime: float) -> tuple:
+    """Return the date and numeric column names of a Parquet file from its schema"""
+    schema = pq.read_schema(path)
+    return tuple(
+        field.name for field in schema
+        if field.name in DATE_COLUMNS or pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+    )
+
+@lru_cache(maxsize=32)
+def _load_parquet(path: str, mtime: float,
+                  columns: Optional[tuple] = None) -> Tuple[pd.DataFrame, tuple, Optional[str]]:
+    """Load a Parquet file (optionally only some columns), cached per (path, mtime).
+
+    Returns (df, numeric_cols, date_col) like _load_csv, taking the numeric
+    columns from the Arrow schema. The returned frame is shared between
+    requests and must not be mutated.
+    """
+    df = pd.read_parquet(path, columns=list(columns) if columns else None)
+    numeric_cols = tuple(
+        field.name for field in pq.read_schema(path)
+        if field.name in df.columns and (pa.types.is_integer(field.type) or pa.types.is_floating(field.type))
+    )
+    date_col = next((col for col in DATE_COLUMNS if col in df.columns), None)
+    return df, numeric_cols, date_col
+
+def _parquet_sibling(csv_filename: str, files: Dict[str, Tuple[int, float]]) -> Optional[str]:
+    """Return the Parquet copy written next to a CSV file by the ETL, if usable"""
+    parquet_filename = os.path.splitext(csv_filename)[0] + '.parquet'
+    if PYARROW_AVAILABLE and parquet_filename in files:
+        return parquet_filename
+    return None
+
+# Bound the number of files parsed concurrently to the number of cores
+_file_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+async def _run_in_thread(func, *args):
+    """Run blocking per-file work in a worker thread, bounded by _file_semaphore"""
+    async with _file_semaphore:
+        return await asyncio.to_thread(func, *args)
+
+@njit(parallel=True, cache=True)
+def _slopes(Y: np.ndarray) -> np.ndarray:
+    """Least-squares slope of each column of Y against its row position.
+
+    NaNs are skipped and x counts only the valid values, matching
+    np.polyfit(np.arange(len(values)), values, 1) on the dropna'd column.
+    Columns with fewer than two values get NaN.
+    """
+    n_rows, n_cols = Y.shape
+    slopes = np.full(n_cols, np.nan)
+    for j in prange(n_cols):
+        n = 0
+        sum_y = 0.0
+        for i in range(n_rows):
+            if not np.isnan(Y[i, j]):
+                sum_y += Y[i, j]
+                n += 1
+        if n < 2:
+            continue
+        
+        # slope = cov(x, y) / var(x) with x = 0..n-1
+        x_mean = (n - 1) / 2.0
+        y_mean = sum_y / n
+        cov = 0.0
+        var = 0.0
+        x = 0
+        for i in range(n_rows):
+            if not np.isnan(Y[i, j]):
+                dx = x - x_mean
+                cov += dx * (Y[i, j] - y_mean)
+                var += dx * dx
+                x += 1
+        slopes[j] = cov / var
+    return slopes
+
+# Compile the trend kernel up front so the first request doesn't pay for it.
+# This stays at import so numba's worker pool starts on the main thread.
+_slopes(np.zeros((2, 2)))
 
 # Pydantic models for request/response
 class PredictionRequest(BaseModel):
@@ -106,154 +381,289 @@ async def get_data_sources():
     data_dir = "../data"
     sources = []
     
-    if os.path.exists(data_dir):
-        for filename in os.listdir(data_dir):
-            if filename.endswith('.csv'):
-                source_name = filename.replace('processed_', '').replace('raw_', '').split('_')[0]
-                filepath = os.path.join(data_dir, filename)
-                file_size = os.path.getsize(filepath)
-                
-                sources.append({
-                    "name": source_name,
-                    "filename": filename,
-                    "size_bytes": file_size,
-                    "type": "processed" if filename.startswith("processed_") else "raw"
-                })
+    for filename, file_size, _ in _list_data(data_dir):
+        m = _FN_RE.match(filename)
+        if m and filename.endswith('.csv'):
+            kind, source_name = m.group(1), m.group(2)
+            
+            sources.append({
+                "name": source_name,
+                "filename": filename,
+                "size_bytes": file_size,
+                "type": kind
+            })
     
     return {"sources": sources}
 
+def _stream_records(source: str, df: pd.DataFrame):
+    """Yield the /data response for df as JSON, encoding STREAM_BATCH_ROWS records at a time"""
+    header = _dumps({"source": source, "total_records": len(df), "columns": list(df.columns)})
+    yield header[:-1] + b',"data":['
+    for start in range(0, len(df), STREAM_BATCH_ROWS):
+        batch = _dumps(df.iloc[start:start + STREAM_BATCH_ROWS].to_dict(orient='records'))
+        # Drop each batch's brackets so the batches join into one array
+        yield (b',' if start else b'') + batch[1:-1]
+    yield b']}'
+
 @app.get("/data/{source}")
-async def get_data(source: str, limit: int = Query(100, ge=1, le=1000)):
-    """Get data from a specific source"""
+async def get_data(
+    source: str,
+    limit: int = Query(100, ge=1, le=1000),
+    payload_format: str = Query("records", alias="format", pattern="^(records|columnar)$")
+):
+    """Get data from a specific source.
+
+    format=columnar returns data as {column: [values]} instead of a list of
+    row records, which avoids repeating every column name per row.
+    """
     data_dir = "../data"
+    files = {filename: (size, mtime) for filename, size, mtime in _list_data(data_dir)}
     
     # Look for processed data first, then raw data
-    processed_file = os.path.join(data_dir, f"processed_{source}_{datetime.now().strftime('%Y%m%d')}.csv")
-    raw_file = os.path.join(data_dir, f"raw_{source}_{datetime.now().strftime('%Y%m%d')}.csv")
+    processed_file = f"processed_{source}_{datetime.now().strftime('%Y%m%d')}.csv"
+    raw_file = f"raw_{source}_{datetime.now().strftime('%Y%m%d')}.csv"
     
     file_to_read = None
-    if os.path.exists(processed_file):
+    if processed_file in files:
         file_to_read = processed_file
-    elif os.path.exists(raw_file):
+    elif raw_file in files:
         file_to_read = raw_file
     else:
         # Try to find any file with this source name
-        for filename in os.listdir(data_dir):
-            if filename.startswith(f"processed_{source}_") or filename.startswith(f"raw_{source}_"):
-                file_to_read = os.path.join(data_dir, filename)
+        for filename in files:
+            if (filename.startswith(f"processed_{source}_") or filename.startswith(f"raw_{source}_")) and filename.endswith('.csv'):
+                file_to_read = filename
                 break
     
-    if not file_to_read or not os.path.exists(file_to_read):
+    if not file_to_read:
         raise HTTPException(status_code=404, detail=f"Data source '{source}' not found")
     
     try:
-        df = pd.read_csv(file_to_read)
-        
-        # Convert date columns
-        date_cols = ['date', 'datetime']
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col])
+        # Only parse the rows that will be returned
+        df, _, _ = _load_csv(os.path.join(data_dir, file_to_read), files[file_to_read][1], nrows=limit)
         
-        # Limit results
-        df = df.head(limit)
+        # Large record payloads are encoded batch by batch as they are sent
+        if payload_format == "records" and len(df) > STREAM_MIN_ROWS:
+            return StreamingResponse(_stream_records(source, df), media_type="application/json")
         
         # Convert to JSON-serializable format
-        data = df.to_dict(orient='records')
+        if payload_format == "columnar":
+            data = df.to_dict(orient='list')
+        else:
+            data = df.to_dict(orient='records')
         
-        return {
+        # Returned directly so records skip jsonable_encoder
+        return PandasJSONResponse({
             "source": source,
             "total_records": len(df),
             "columns": list(df.columns),
             "data": data
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error reading data for {source}: {e}")
         raise HTTPException(status_code=500, detail=f"Error reading data: {str(e)}")
 
+def _insights_for_file(data_dir: str, filename: str, source_name: str,
+                       files: Dict[str, Tuple[int, float]]) -> Optional[Tuple[str, dict]]:
+    """Build the insights for one processed file, or None if it cannot be read"""
+    try:
+        # Prefer the typed Parquet copy over re-parsing the CSV
+        parquet_file = _parquet_sibling(filename, files)
+        if parquet_file:
+            df, numeric_cols, _ = _load_parquet(os.path.join(data_dir, parquet_file), files[parquet_file][1])
+        else:
+            df, numeric_cols, _ = _load_csv(os.path.join(data_dir, filename), files[filename][1])
+        
+        source_insights = {
+            'total_records': len(df),
+            'columns': list(df.columns),
+            'numeric_summary': {},
+            'latest_data': {}
+        }
+        
+        # Numeric summary (all statistics in one aggregation)
+        if numeric_cols:
+            stats = df[list(numeric_cols)].agg(['mean', 'std', 'min', 'max', 'median']).astype(float)
+            source_insights['numeric_summary'] = {col: stats[col].to_dict() for col in numeric_cols}
+        
+        # Latest data (last 5 records)
+        if len(df) > 0:
+            latest_data = df.tail(5).to_dict(orient='records')
+            source_insights['latest_data'] = latest_data
+        
+        # Source-specific insights
+        if source_name == 'covid' and 'cases' in df.columns:
+            latest_cases = df['cases'].iloc[-1] if len(df) > 0 else 0
+            latest_deaths = df['deaths'].iloc[-1] if len(df) > 0 else 0
+            source_insights['covid_stats'] = {
+                'total_cases': int(latest_cases),
+                'total_deaths': int(latest_deaths),
+                'fatality_rate': float(latest_deaths / latest_cases * 100) if latest_cases > 0 else 0
+            }
+        
+        elif source_name == 'stock' and 'close' in df.columns:
+            # Work on the raw arrays; only the last two closes matter here
+            closes = df['close'].to_numpy()
+            latest_price = closes[-1] if closes.size > 0 else 0
+            price_change = closes[-1] / closes[-2] - 1 if closes.size > 1 else 0
+            if 'daily_return' in df.columns and len(df) > 1:
+                volatility = float(np.nanstd(df['daily_return'].to_numpy(), ddof=1) * 100)
+            else:
+                volatility = 0
+            source_insights['stock_stats'] = {
+                'latest_price': float(latest_price),
+                'daily_change': float(price_change * 100),
+                'volatility': volatility
+            }
+        
+        return source_name, source_insights
+        
+    except Exception as e:
+        logger.error(f"Error processing insights for {source_name}: {e}")
+        return None
+
+# Rendered /insights response, keyed on the processed files it was built from
+_insights_cache: Dict[str, bytes] = {}
+
 @app.get("/insights")
 async def get_insights():
     """Get insights from all data sources"""
     data_dir = "../data"
     insights = {}
     
-    if os.path.exists(data_dir):
-        for filename in os.listdir(data_dir):
-            if filename.startswith('processed_') and filename.endswith('.csv'):
-                source_name = filename.replace('processed_', '').split('_')[0]
-                filepath = os.path.join(data_dir, filename)
-                
-                try:
-                    df = pd.read_csv(filepath)
-                    
-                    # Convert date columns
-                    date_cols = ['date', 'datetime']
-                    for col in date_cols:
-                        if col in df.columns:
-                            df[col] = pd.to_datetime(df[col])
-                    
-                    source_insights = {
-                        'total_records': len(df),
-                        'columns': list(df.columns),
-                        'numeric_summary': {},
-                        'latest_data': {}
-                    }
-                    
-                    # Numeric summary
-                    numeric_cols = df.select_dtypes(include=[np.number]).columns
-                    for col in numeric_cols:
-                        source_insights['numeric_summary'][col] = {
-                            'mean': float(df[col].mean()),
-                            'std': float(df[col].std()),
-                            'min': float(df[col].min()),
-                            'max': float(df[col].max()),
-                            'median': float(df[col].median())
-                        }
-                    
-                    # Latest data (last 5 records)
-                    if len(df) > 0:
-                        latest_data = df.tail(5).to_dict(orient='records')
-                        source_insights['latest_data'] = latest_data
-                    
-                    # Source-specific insights
-                    if source_name == 'covid' and 'cases' in df.columns:
-                        latest_cases = df['cases'].iloc[-1] if len(df) > 0 else 0
-                        latest_deaths = df['deaths'].iloc[-1] if len(df) > 0 else 0
-                        source_insights['covid_stats'] = {
-                            'total_cases': int(latest_cases),
-                            'total_deaths': int(latest_deaths),
-                            'fatality_rate': float(latest_deaths / latest_cases * 100) if latest_cases > 0 else 0
-                        }
-                    
-                    elif source_name == 'stock' and 'close' in df.columns:
-                        latest_price = df['close'].iloc[-1] if len(df) > 0 else 0
-                        price_change = df['close'].pct_change().iloc[-1] if len(df) > 1 else 0
-                        source_insights['stock_stats'] = {
-                            'latest_price': float(latest_price),
-                            'daily_change': float(price_change * 100),
-                            'volatility': float(df['daily_return'].std() * 100) if 'daily_return' in df.columns else 0
-                        }
-                    
-                    insights[source_name] = source_insights
-                    
-                except Exception as e:
-                    logger.error(f"Error processing insights for {source_name}: {e}")
-                    continue
-    
-    return {"insights": insights}
+    files = {filename: (size, mtime) for filename, size, mtime in _list_data(data_dir)}
+    
+    # Insights only change when a processed file is added, removed or rewritten
+    cache_key = ";".join(
+        f"{filename}:{mtime}" for filename, (_, mtime) in sorted(files.items())
+        if filename.startswith('processed_')
+    )
+    if cache_key in _insights_cache:
+        return Response(content=_insights_cache[cache_key], media_type="application/json")
+    
+    processed_files = []
+    for filename in files:
+        m = _FN_RE.match(filename)
+        if m and m.group(1) == 'processed' and filename.endswith('.csv'):
+            processed_files.append((filename, m.group(2)))
+    
+    # Files are parsed in worker threads; gather keeps directory order
+    results = await asyncio.gather(*(
+        _run_in_thread(_insights_for_file, data_dir, filename, source_name, files)
+        for filename, source_name in processed_files
+    ))
+    for result in results:
+        if result is not None:
+            source_name, source_insights = result
+            insights[source_name] = source_insights
+
+    # Store the serialized body so cache hits skip encoding entirely
+    body = PandasJSONResponse({"insights": insights}).body
+    _insights_cache.clear()
+    _insights_cache[cache_key] = body
+    
+    return Response(content=body, media_type="application/json")
 
 @app.get("/models")
 async def get_models():
     """Get information about trained models"""
     model_summary = ml_models.get_model_summary()
     
-    # Add feature importance if available
+    # Add feature importance if available, most important first
     if ml_models.feature_importance:
-        model_summary['feature_importance'] = ml_models.feature_importance
+        model_summary['feature_importance'] = {
+            name: ml_models.get_feature_importance(name) for name in ml_models.feature_importance
+        }
     
     return model_summary
 
+# Predictions queued within PREDICT_BATCH_WAIT seconds share one model call
+PREDICT_BATCH_WAIT = 0.005
+PREDICT_MAX_BATCH = 256
+_predict_queues: Dict[str, asyncio.Queue] = {}
+_predict_batchers: Dict[str, asyncio.Task] = {}
+
+def _is_batchable(features: Dict[str, Any], model_features: List[str]) -> bool:
+    """Whether a request has every model feature as a plain number.
+
+    Only such rows are batched: for them the NaN filling in make_prediction
+    is a no-op, so they can be predicted straight from an array.
+    """
+    for name in model_features:
+        value = features.get(name)
+        if not isinstance(value, (int, float)) or value != value:
+            return False
+    return True
+
+def _predict_rows(model_name: str, rows: List[np.ndarray]) -> List[Any]:
+    """Predict rows in one model call, falling back to one call per row if the batch fails"""
+    try:
+        predictions = ml_models.predict_array(model_name, np.vstack(rows))
+        if len(predictions) == len(rows):
+            return [predictions[i:i + 1] for i in range(len(rows))]
+    except Exception as e:
+        logger.warning(f"Batched prediction failed for {model_name}, retrying per request: {e}")
+    
+    results = []
+    for row in rows:
+        try:
+            results.append(ml_models.predict_array(model_name, row))
+        except Exception as e:
+            results.append(e)
+    return results
+
+async def _predict_batcher(model_name: str, queue: asyncio.Queue):
+    """Collect queued requests for one model and resolve them from a single prediction call"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + PREDICT_BATCH_WAIT
+        while len(batch) < PREDICT_MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        try:
+            results = await asyncio.to_thread(_predict_rows, model_name, [row for row, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+async def _queue_prediction(model_name: str, features: Dict[str, Any]):
+    """Predict one request, sharing the model call with concurrent requests where possible"""
+    model_features = ml_models.model_metadata.get(model_name, {}).get('features', [])
+    if not _is_batchable(features, model_features):
+        return ml_models.make_prediction(model_name, pd.DataFrame([features]))
+    
+    # Complete rows skip pandas: one float32 row in training feature order
+    row = np.fromiter(
+        (features[name] for name in model_features), dtype=np.float32, count=len(model_features)
+    ).reshape(1, -1)
+    
+    # A batcher from an earlier event loop may have finished or been cancelled
+    task = _predict_batchers.get(model_name)
+    if task is None or task.done():
+        _predict_queues[model_name] = asyncio.Queue()
+        _predict_batchers[model_name] = asyncio.create_task(
+            _predict_batcher(model_name, _predict_queues[model_name])
+        )
+    
+    future = asyncio.get_running_loop().create_future()
+    await _predict_queues[model_name].put((row, future))
+    return await future
+
 @app.post("/predict")
 async def make_prediction(request: PredictionRequest):
     """Make predictions using trained models"""
@@ -264,11 +674,8 @@ async def make_prediction(request: PredictionRequest):
         )
     
     try:
-        # Convert features to DataFrame
-        features_df = pd.DataFrame([request.features])
-        
-        # Make prediction
-        prediction = ml_models.make_prediction(request.model_name, features_df)
+        # Make prediction, batched with other requests for the same model
+        prediction = await _queue_prediction(request.model_name, request.features)
         
         # Get model metadata
         metadata = ml_models.model_metadata.get(request.model_name, {})
@@ -285,6 +692,26 @@ async def make_prediction(request: PredictionRequest):
         logger.error(f"Error making prediction: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+def _analyze_file(data_dir: str, filename: str, source_name: str,
+                  file_size: int, mtime: float) -> Optional[Tuple[str, dict]]:
+    """Compute the analytics entry for one CSV file, or None if it cannot be read"""
+    filepath = os.path.join(data_dir, filename)
+    
+    try:
+        # Only counts are needed, so read the header and count lines
+        columns = _read_csv_header(filepath, mtime)
+        
+        return source_name, {
+            "records": _fast_row_count(filepath, mtime),
+            "columns": len(columns),
+            "file_size_mb": round(file_size / (1024 * 1024), 2),
+            "last_updated": datetime.fromtimestamp(mtime).isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error analyzing {filename}: {e}")
+        return None
+
 @app.get("/analytics")
 async def get_analytics():
     """Get comprehensive analytics and statistics"""
@@ -300,32 +727,30 @@ async def get_analytics():
     if os.path.exists(data_dir):
         total_records = 0
         sources_count = 0
+        entries = _list_data(data_dir)
         
-        for filename in os.listdir(data_dir):
-            if filename.endswith('.csv'):
-                source_name = filename.replace('processed_', '').replace('raw_', '').split('_')[0]
-                filepath = os.path.join(data_dir, filename)
-                
-                try:
-                    df = pd.read_csv(filepath)
-                    records = len(df)
-                    total_records += records
-                    sources_count += 1
-                    
-                    analytics["data_sources"][source_name] = {
-                        "records": records,
-                        "columns": len(df.columns),
-                        "file_size_mb": round(os.path.getsize(filepath) / (1024 * 1024), 2),
-                        "last_updated": datetime.fromtimestamp(os.path.getmtime(filepath)).isoformat()
-                    }
-                    
-                except Exception as e:
-                    logger.error(f"Error analyzing {filename}: {e}")
+        csv_entries = [entry for entry in entries if entry[0].endswith('.csv')]
+        data_files = []
+        for filename, file_size, mtime in csv_entries:
+            m = _FN_RE.match(filename)
+            if m:
+                data_files.append((filename, m.group(2), file_size, mtime))
+        
+        # Files are parsed in worker threads; gather keeps directory order
+        results = await asyncio.gather(*(
+            _run_in_thread(_analyze_file, data_dir, *data_file) for data_file in data_files
+        ))
+        for result in results:
+            if result is not None:
+                source_name, source_stats = result
+                total_records += source_stats["records"]
+                sources_count += 1
+                analytics["data_sources"][source_name] = source_stats
         
         analytics["overall_stats"] = {
             "total_data_sources": sources_count,
             "total_records": total_records,
-            "data_directory_size_mb": round(sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir) if f.endswith('.csv')) / (1024 * 1024), 2)
+            "data_directory_size_mb": round(sum(size for _, size, _ in csv_entries) / (1024 * 1024), 2)
         }
     
     # Model analytics
@@ -339,48 +764,47 @@ async def get_trends(source: str, days: int = Query(30, ge=1, le=365)):
     """Get trend analysis for a specific data source"""
     data_dir = "../data"
     
+    files = {filename: (size, mtime) for filename, size, mtime in _list_data(data_dir)}
+    
     # Find the data file
     file_to_read = None
-    for filename in os.listdir(data_dir):
-        if filename.startswith(f"processed_{source}_") or filename.startswith(f"raw_{source}_"):
-            file_to_read = os.path.join(data_dir, filename)
+    for filename in files:
+        if (filename.startswith(f"processed_{source}_") or filename.startswith(f"raw_{source}_")) and filename.endswith('.csv'):
+            file_to_read = filename
             break
     
-    if not file_to_read or not os.path.exists(file_to_read):
+    if not file_to_read:
         raise HTTPException(status_code=404, detail=f"Data source '{source}' not found")
     
     try:
-        df = pd.read_csv(file_to_read)
-        
-        # Convert date columns
-        date_cols = ['date', 'datetime']
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col])
-                break
+        # Read only the date and numeric columns, from the Parquet copy if there is one
+        parquet_file = _parquet_sibling(file_to_read, files)
+        if parquet_file:
+            parquet_path = os.path.join(data_dir, parquet_file)
+            mtime = files[parquet_file][1]
+            df, numeric_cols, date_col = _load_parquet(parquet_path, mtime, _read_parquet_columns(parquet_path, mtime))
+        else:
+            csv_path = os.path.join(data_dir, file_to_read)
+            mtime = files[file_to_read][1]
+            df, numeric_cols, date_col = _load_csv(csv_path, mtime, usecols=_read_csv_numeric_columns(csv_path, mtime))
         
-        if not any(col in df.columns for col in date_cols):
+        if date_col is None:
             raise HTTPException(status_code=400, detail="No date column found in data")
         
-        # Get the date column
-        date_col = next(col for col in date_cols if col in df.columns)
-        
         # Sort by date and get recent data
         df = df.sort_values(date_col)
         recent_data = df.tail(days)
         
         # Calculate trends for numeric columns
         trends = {}
-        numeric_cols = recent_data.select_dtypes(include=[np.number]).columns
         
-        for col in numeric_cols:
+        # Trend (slope of linear regression) for every column in one pass
+        slopes = _slopes(recent_data[list(numeric_cols)].to_numpy(dtype=np.float64))
+        
+        for col, slope in zip(numeric_cols, slopes):
             if col != date_col:
                 values = recent_data[col].dropna()
                 if len(values) > 1:
-                    # Calculate trend (slope of linear regression)
-                    x = np.arange(len(values))
-                    slope = np.polyfit(x, values, 1)[0]
-                    
                     trends[col] = {
                         "trend_direction": "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable",
                         "trend_magnitude": float(abs(slope)),
@@ -406,5 +830,10 @@ async def get_trends(source: str, days: int = Query(30, ge=1, le=365)):
         raise HTTPException(status_code=500, detail=f"Error analyzing trends: {str(e)}")
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # uvloop and httptools ship with uvicorn[standard]; uvloop has no Windows build
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    # Workers need an import string; each one loads its own models in lifespan
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop=loop, http="httptools",
+                workers=os.cpu_count(), app_dir=os.path.dirname(os.path.abspath(__file__))) 
\ No newline at end of file
@@ -3,28 +3,77 @@ Simplified FastAPI Backend for Data Science Project
 Serves data insights, predictions, and analytics without external dependencies
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 import pandas as pd
 import numpy as np
+import asyncio
+import hashlib
 import json
+import orjson
 import os
 import sys
+import zlib
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 import logging
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_TYPE = "application/x-ndjson"
+NDJSON_BATCH_ROWS = 128
+
+def _json_default(obj):
+    """Serialize pandas scalars that orjson does not handle natively"""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(content: Any) -> bytes:
+    """Encode content with orjson, accepting numpy values and pandas Timestamps"""
+    return orjson.dumps(
+        content,
+        default=_json_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+class PandasJSONResponse(ORJSONResponse):
+    """orjson response that also accepts numpy values and pandas Timestamps"""
+    
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Precompute the insights before serving"""
+    _refresh_insights()
+    yield
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Data Science Analytics API",
     description="API for serving data insights, predictions, and analytics",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=PandasJSONResponse,
+    lifespan=lifespan
 )
 
 # Load environment variables
@@ -43,6 +92,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies (bulk data, reports)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Simple ML Models class for demo
 class SimpleMLModels:
     def __init__(self):
@@ -73,28 +125,34 @@ class SimpleMLModels:
             "stock_prediction": {"volume": 0.4, "high": 0.3, "low": 0.2, "open": 0.1},
             "weather_prediction": {"temperature": 0.5, "humidity": 0.3, "pressure": 0.2}
         }
-    
-    def get_model_summary(self):
-        return {
+        
+        # The mock models never change, so the summary is built once
+        self._summary = {
             "total_models": len(self.models),
             "available_models": list(self.models.keys()),
             "model_types": list(set(self.models.values())),
             "metadata": self.model_metadata
         }
     
-    def make_prediction(self, model_name, features_df):
+    def get_model_summary(self):
+        return self._summary
+    
+    def make_prediction(self, model_name, n=1, seed=None):
+        """Mock prediction for n rows; passing a seed makes the result deterministic"""
         if model_name not in self.models:
             raise ValueError(f"Model {model_name} not found")
         
+        rng = np.random if seed is None else np.random.default_rng(seed)
+        
         # Simple mock prediction based on model type
         if self.models[model_name] == "linear_regression":
-            return np.random.normal(100, 10, len(features_df))
+            return rng.normal(100, 10, n)
         elif self.models[model_name] == "random_forest":
-            return np.random.normal(150, 15, len(features_df))
+            return rng.normal(150, 15, n)
         elif self.models[model_name] == "xgboost":
-            return np.random.normal(25, 5, len(features_df))
+            return rng.normal(25, 5, n)
         else:
-            return np.random.normal(50, 10, len(features_df))
+            return rng.normal(50, 10, n)
 
 # Simple Data Processor class for demo
 class SimpleDataProcessor:
@@ -102,39 +160,133 @@ class SimpleDataProcessor:
         pass
     
     def generate_sample_data(self, source_name, num_records=100):
-        """Generate sample data for demonstration"""
-        dates = pd.date_range(start='2024-01-01', periods=num_records, freq='D')
-        
-        if source_name == 'covid':
-            data = {
-                'date': dates,
-                'cases': np.random.randint(100, 1000, num_records),
-                'deaths': np.random.randint(10, 100, num_records),
-                'recovered': np.random.randint(50, 500, num_records)
-            }
-        elif source_name == 'stock':
-            data = {
-                'date': dates,
-                'open': np.random.uniform(100, 200, num_records),
-                'high': np.random.uniform(150, 250, num_records),
-                'low': np.random.uniform(50, 150, num_records),
-                'close': np.random.uniform(100, 200, num_records),
-                'volume': np.random.randint(1000000, 10000000, num_records)
-            }
-        elif source_name == 'weather':
-            data = {
-                'date': dates,
-                'temperature': np.random.uniform(10, 30, num_records),
-                'humidity': np.random.uniform(30, 90, num_records),
-                'pressure': np.random.uniform(1000, 1020, num_records)
-            }
-        else:
-            data = {
-                'date': dates,
-                'value': np.random.uniform(0, 100, num_records)
-            }
-        
-        return pd.DataFrame(data)
+        """Generate sample data for demonstration.
+
+        Results are cached per (source_name, num_records) until clear_cache()
+        is called, so the returned frame is shared and must not be mutated.
+        """
+        return _generate_sample_data(source_name, num_records)
+    
+    def generate_sample_ipc(self, source_name, num_records=100):
+        """Return the sample data for a source as cached Arrow IPC stream bytes"""
+        return _sample_data_ipc(source_name, num_records)
+    
+    def generate_sample_json(self, source_name, num_records=100, payload_format="records"):
+        """Return the /data response for a source as cached JSON bytes"""
+        return _sample_data_json(source_name, num_records, payload_format)
+    
+    def clear_cache(self):
+        """Drop cached sample data so the next calls generate fresh values"""
+        _generate_sample_data.cache_clear()
+        _sample_data_table.cache_clear()
+        _sample_data_ipc.cache_clear()
+        _sample_data_json.cache_clear()
+
+@lru_cache(maxsize=None)
+def _rng(source_name):
+    """Seeded PCG64 generator per source, so runs stay reproducible when sources are generated concurrently"""
+    return np.random.default_rng([0, zlib.crc32(source_name.encode())])
+
+# Numeric columns of each sample source; the schema is fixed, so no per-request dtype scan
+NUMERIC_COLS = {
+    'covid': ['cases', 'deaths', 'recovered'],
+    'stock': ['open', 'high', 'low', 'close', 'volume'],
+    'weather': ['temperature', 'humidity', 'pressure']
+}
+
+@lru_cache(maxsize=16)
+def _dates(num_records):
+    """Daily dates from 2024-01-01, shared by every source of the same length"""
+    return pd.date_range(start='2024-01-01', periods=num_records, freq='D')
+
+@lru_cache(maxsize=64)
+def _generate_sample_data(source_name, num_records):
+    """Build a random sample DataFrame for one source"""
+    dates = _dates(num_records)
+    rng = _rng(source_name)
+    
+    # One draw per source, with a (low, high) range per column; the ranges fit in 32-bit types
+    if source_name == 'covid':
+        values = rng.integers([100, 10, 50], [1000, 100, 500], size=(num_records, 3), dtype=np.int32)
+        data = {
+            'date': dates,
+            'cases': values[:, 0],
+            'deaths': values[:, 1],
+            'recovered': values[:, 2]
+        }
+    elif source_name == 'stock':
+        prices = rng.uniform([100, 150, 50, 100], [200, 250, 150, 200], size=(num_records, 4)).astype(np.float32)
+        data = {
+            'date': dates,
+            'open': prices[:, 0],
+            'high': prices[:, 1],
+            'low': prices[:, 2],
+            'close': prices[:, 3],
+            'volume': rng.integers(1000000, 10000000, num_records, dtype=np.int32)
+        }
+    elif source_name == 'weather':
+        values = rng.uniform([10, 30, 1000], [30, 90, 1020], size=(num_records, 3)).astype(np.float32)
+        data = {
+            'date': dates,
+            'temperature': values[:, 0],
+            'humidity': values[:, 1],
+            'pressure': values[:, 2]
+        }
+    else:
+        data = {
+            'date': dates,
+            'value': rng.uniform(0, 100, num_records).astype(np.float32)
+        }
+    
+    return pd.DataFrame(data)
+
+@lru_cache(maxsize=64)
+def _sample_data_table(source_name, num_records):
+    """Convert the cached sample DataFrame for one source to an Arrow table"""
+    return pa.Table.from_pandas(_generate_sample_data(source_name, num_records), preserve_index=False)
+
+@lru_cache(maxsize=64)
+def _sample_data_ipc(source_name, num_records):
+    """Encode the cached sample data for one source as an Arrow IPC stream"""
+    table = _sample_data_table(source_name, num_records)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _sample_records(df):
+    """Iterate the records of df, zipped from the column arrays.
+
+    Zipping keeps numpy scalars, which orjson writes in their shortest float32
+    form; to_dict() would widen them to Python floats.
+    """
+    columns = list(df.columns)
+    arrays = [df[col].astype(object).to_numpy() if col == 'date' else df[col].to_numpy() for col in columns]
+    return (dict(zip(columns, row)) for row in zip(*arrays))
+
+@lru_cache(maxsize=64)
+def _sample_data_json(source_name, num_records, payload_format):
+    """Encode the cached sample DataFrame for one source as a /data JSON body"""
+    df = _generate_sample_data(source_name, num_records)
+    
+    # Convert to JSON-serializable format
+    if payload_format == "columnar":
+        data = {col: df[col].to_numpy() for col in df.columns}
+    else:
+        data = list(_sample_records(df))
+    
+    return _dumps({
+        "source": source_name,
+        "total_records": len(df),
+        "columns": list(df.columns),
+        "data": data
+    })
+
+def _sample_ndjson(source_name, num_records):
+    """Yield the sample records for one source as NDJSON, NDJSON_BATCH_ROWS lines at a time"""
+    records = _sample_records(_generate_sample_data(source_name, num_records))
+    while batch := list(islice(records, NDJSON_BATCH_ROWS)):
+        yield b"".join(_dumps(record) + b"\n" for record in batch)
 
 # Initialize components
 ml_models = SimpleMLModels()
@@ -207,32 +359,68 @@ async def get_data_sources():
     return {"sources": sources}
 
 @app.get("/data/{source}")
-async def get_data(source: str, limit: int = Query(100, ge=1, le=1000)):
-    """Get data from a specific source"""
+async def get_data(
+    source: str,
+    limit: int = Query(100, ge=1, le=1000),
+    payload_format: str = Query("records", alias="format", pattern="^(records|columnar)$"),
+    accept: Optional[str] = Header(None)
+):
+    """Get data from a specific source.
+
+    format=columnar returns data as {column: array} straight from the numpy
+    buffers instead of building a dict per row. Sending
+    Accept: application/vnd.apache.arrow.stream returns the table as an
+    Arrow IPC stream instead of JSON, and Accept: application/x-ndjson
+    streams one JSON record per line.
+    """
     if source not in ['covid', 'stock', 'weather']:
         raise HTTPException(status_code=404, detail=f"Data source '{source}' not found")
     
     try:
-        # Generate sample data
-        df = data_processor.generate_sample_data(source, limit)
-        
-        # Convert to JSON-serializable format
-        data = df.to_dict(orient='records')
-        
-        return {
-            "source": source,
-            "total_records": len(df),
-            "columns": list(df.columns),
-            "data": data
-        }
+        if PYARROW_AVAILABLE and accept and ARROW_STREAM_TYPE in accept:
+            return Response(
+                content=data_processor.generate_sample_ipc(source, limit),
+                media_type=ARROW_STREAM_TYPE
+            )
+        
+        if accept and NDJSON_TYPE in accept:
+            return StreamingResponse(_sample_ndjson(source, limit), media_type=NDJSON_TYPE)
+        
+        # The body is encoded once per sample data set
+        return Response(
+            content=data_processor.generate_sample_json(source, limit, payload_format),
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Error reading data for {source}: {e}")
         raise HTTPException(status_code=500, detail=f"Error reading data: {str(e)}")
 
-@app.get("/insights")
-async def get_insights():
-    """Get insights from all data sources"""
+def _numeric_summary(source_name, num_records):
+    """Mean, std, min, max and median of every numeric sample column"""
+    if not PYARROW_AVAILABLE:
+        df = _generate_sample_data(source_name, num_records)
+        numeric_cols = NUMERIC_COLS[source_name]
+        stats = df[numeric_cols].agg(['mean', 'std', 'min', 'max', 'median']).astype(float)
+        return {col: stats[col].to_dict() for col in numeric_cols}
+    
+    # Arrow compute kernels run over each contiguous column buffer
+    table = _sample_data_table(source_name, num_records)
+    summary = {}
+    for name in NUMERIC_COLS[source_name]:
+        column = table.column(name)
+        min_max = pc.min_max(column)
+        summary[name] = {
+            'mean': float(pc.mean(column).as_py()),
+            'std': float(pc.stddev(column, ddof=1).as_py()),
+            'min': float(min_max['min'].as_py()),
+            'max': float(min_max['max'].as_py()),
+            'median': float(pc.quantile(column, q=0.5)[0].as_py())
+        }
+    return summary
+
+def _compute_insights():
+    """Build the insights for every sample source"""
     insights = {}
     
     for source in ['covid', 'stock', 'weather']:
@@ -247,16 +435,7 @@ async def get_insights():
             }
             
             # Numeric summary
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            for col in numeric_cols:
-                if col != 'date':
-                    source_insights['numeric_summary'][col] = {
-                        'mean': float(df[col].mean()),
-                        'std': float(df[col].std()),
-                        'min': float(df[col].min()),
-                        'max': float(df[col].max()),
-                        'median': float(df[col].median())
-                    }
+            source_insights['numeric_summary'] = _numeric_summary(source, 50)
             
             # Source-specific insights
             if source == 'covid' and 'cases' in df.columns:
@@ -283,13 +462,34 @@ async def get_insights():
             logger.error(f"Error processing insights for {source}: {e}")
             continue
     
-    return {"insights": insights}
+    return insights
+
+# Rendered /insights body, computed at startup and again whenever the ETL refreshes the data
+_insights_cache: Dict[str, bytes] = {}
+
+def _refresh_insights():
+    """Recompute the cached insights from the current sample data"""
+    _insights_cache['body'] = _dumps({"insights": _compute_insights()})
+
+@app.get("/insights")
+async def get_insights():
+    """Get insights from all data sources"""
+    if 'body' not in _insights_cache:
+        _refresh_insights()
+    return Response(content=_insights_cache['body'], media_type="application/json")
 
 @app.get("/models")
 async def get_models():
     """Get information about trained models"""
     return ml_models.get_model_summary()
 
+@lru_cache(maxsize=1024)
+def _cached_prediction(model_name, features_key):
+    """Predict for one canonical feature payload, seeded from it so repeats can be cached"""
+    # A stable digest, unlike hash(), gives every worker process the same seed
+    seed = int.from_bytes(hashlib.blake2b(model_name.encode() + features_key, digest_size=8).digest(), 'little')
+    return ml_models.make_prediction(model_name, seed=seed).tolist()
+
 @app.post("/predict")
 async def make_prediction(request: PredictionRequest):
     """Make predictions using trained models"""
@@ -300,21 +500,19 @@ async def make_prediction(request: PredictionRequest):
         )
     
     try:
-        # Convert features to DataFrame
-        features_df = pd.DataFrame([request.features])
-        
-        # Make prediction
-        prediction = ml_models.make_prediction(request.model_name, features_df)
+        # Make prediction, keyed on the features with sorted keys
+        features_key = orjson.dumps(request.features, option=orjson.OPT_SORT_KEYS)
+        prediction = _cached_prediction(request.model_name, features_key)
         
-        # Get model metadata
-        metadata = ml_models.model_metadata.get(request.model_name, {})
+        # Get model metadata (the model name was validated above)
+        metadata = ml_models.model_metadata[request.model_name]
         
         return {
             "model_name": request.model_name,
             "prediction": prediction.tolist() if hasattr(prediction, 'tolist') else prediction,
-            "features_used": metadata.get('features', []),
-            "model_type": metadata.get('best_model', 'unknown'),
-            "accuracy": metadata.get('accuracy', 0.0),
+            "features_used": metadata['features'],
+            "model_type": metadata['best_model'],
+            "accuracy": metadata['accuracy'],
             "timestamp": datetime.now().isoformat()
         }
         
@@ -359,24 +557,28 @@ async def get_trends(source: str, days: int = Query(30, ge=1, le=365)):
         
         # Calculate trends for numeric columns
         trends = {}
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        
-        for col in numeric_cols:
-            if col != 'date':
-                values = df[col].dropna()
-                if len(values) > 1:
-                    # Calculate trend (slope of linear regression)
-                    x = np.arange(len(values))
-                    slope = np.polyfit(x, values, 1)[0]
-                    
-                    trends[col] = {
-                        "trend_direction": "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable",
-                        "trend_magnitude": float(abs(slope)),
-                        "current_value": float(values.iloc[-1]),
-                        "average_value": float(values.mean()),
-                        "min_value": float(values.min()),
-                        "max_value": float(values.max())
-                    }
+        numeric_cols = NUMERIC_COLS[source]
+        
+        # Sample data has no gaps, so every column shares one x axis
+        Y = df[numeric_cols].to_numpy(dtype=np.float64)
+        if len(Y) > 1:
+            # Trend (least-squares slope) for all columns in one matrix product
+            x = np.arange(len(Y)) - (len(Y) - 1) / 2
+            means = Y.mean(axis=0)
+            slopes = x @ (Y - means) / (x @ x)
+            mins = Y.min(axis=0)
+            maxs = Y.max(axis=0)
+            
+            for i, col in enumerate(numeric_cols):
+                slope = slopes[i]
+                trends[col] = {
+                    "trend_direction": "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable",
+                    "trend_magnitude": float(abs(slope)),
+                    "current_value": float(Y[-1, i]),
+                    "average_value": float(means[i]),
+                    "min_value": float(mins[i]),
+                    "max_value": float(maxs[i])
+                }
         
         return {
             "source": source,
@@ -400,20 +602,21 @@ async def run_etl_pipeline():
         logger.info("Starting ETL pipeline...")
         
         # Simulate ETL pipeline execution
-        import time
-        time.sleep(2)  # Simulate processing time
+        await asyncio.sleep(2)  # Simulate processing time
         
-        # Generate fresh data for all sources
+        # Generate fresh data for all sources, each in a worker thread
+        data_processor.clear_cache()
         sources = ['covid', 'stock', 'weather']
-        processed_records = {}
+        results = await asyncio.gather(*(
+            asyncio.to_thread(data_processor.generate_sample_data, source, 100) for source in sources
+        ))
+        processed_records = dict(zip(sources, map(len, results)))
         
-        for source in sources:
-            # Generate new sample data
-            df = data_processor.generate_sample_data(source, 100)
-            processed_records[source] = len(df)
-            logger.info(f"Processed {len(df)} records for {source}")
+        for source, records in processed_records.items():
+            logger.info(f"Processed {records} records for {source}")
         
         total_records = sum(processed_records.values())
+        _refresh_insights()
         
         return {
             "status": "success",
@@ -435,8 +638,7 @@ async def train_models():
         logger.info("Starting model training...")
         
         # Simulate model training
-        import time
-        time.sleep(3)  # Simulate training time
+        await asyncio.sleep(3)  # Simulate training time
         
         # Update model metrics with improved performance
         models_to_train = ['covid_prediction', 'stock_prediction', 'weather_prediction']
@@ -477,8 +679,7 @@ async def export_report():
         logger.info("Generating data report...")
         
         # Simulate report generation
-        import time
-        time.sleep(1)
+        await asyncio.sleep(1)
         
         # Collect data for report
         report_data = {
@@ -533,5 +734,9 @@ async def export_report():
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # uvloop and httptools ship with uvicorn[standard]; uvloop has no Windows build.
+    # Single worker: the sample data and insights caches live in process memory
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop, http="httptools") 
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Stock Indicator Kernels
+Numba-compiled loops for the technical indicators computed during collection
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, error_model='numpy')
+def pct_change(x: np.ndarray) -> np.ndarray:
+    """Change from the previous value, matching Series.pct_change() on gap-free input"""
+    out = np.empty(x.size)
+    if x.size > 0:
+        out[0] = np.nan
+    for i in range(1, x.size):
+        out[i] = x[i] / x[i - 1] - 1.0
+    return out
+
+
+@njit(cache=True, error_model='numpy')
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Sample standard deviation over a trailing window, matching Series.rolling(window).std()"""
+    out = np.full(x.size, np.nan)
+    for i in range(window - 1, x.size):
+        total = 0.0
+        complete = True
+        for j in range(i - window + 1, i + 1):
+            if np.isnan(x[j]):
+                complete = False
+                break
+            total += x[j]
+        if not complete:
+            continue
+
+        # Two passes per window keep the variance exact for short windows
+        mean = total / window
+        squares = 0.0
+        for j in range(i - window + 1, i + 1):
+            squares += (x[j] - mean) ** 2
+        out[i] = np.sqrt(squares / (window - 1))
+    return out
+
+
+# Output columns of stock_indicators, in order
+STOCK_INDICATOR_COLUMNS = (
+    'sma_5', 'sma_20', 'ema_12', 'ema_26', 'macd', 'macd_signal', 'rsi',
+    'bb_middle', 'bb_upper', 'bb_lower', 'momentum_5', 'momentum_10',
+    'volume_sma', 'volume_ratio'
+)
+
+
+@njit(cache=True, error_model='numpy')
+def _ewm_step(avg: float, old_wt: float, x: float, decay: float, first: bool):
+    """One step of an adjust=True EWM mean whose old weights shrink by decay, returning (avg, old_wt)"""
+    if first:
+        return x, 1.0
+    old_wt *= decay
+    if avg != x:
+        avg = (old_wt * avg + x) / (old_wt + 1.0)
+    return avg, old_wt + 1.0
+
+
+@njit(cache=True, error_model='numpy')
+def stock_indicators(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """Technical indicators for gap-free close/volume arrays in a single pass.
+
+    Matches the pandas chain it replaces: rolling means, adjusted EWMs, a
+    14-day rolling-mean RSI and a sample-std Bollinger band. Returns one
+    contiguous row per STOCK_INDICATOR_COLUMNS entry.
+    """
+    n = close.size
+    out = np.full((len(STOCK_INDICATOR_COLUMNS), n), np.nan)
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+
+    sum_5 = 0.0
+    sum_20 = 0.0
+    volume_sum = 0.0
+    gain_sum = 0.0
+    loss_sum = 0.0
+    # Non-zero gains/losses in the RSI window; an empty count means an exact zero sum
+    gain_count = 0
+    loss_count = 0
+    ema_12 = ema_26 = signal = 0.0
+    wt_12 = wt_26 = wt_signal = 0.0
+
+    for i in range(n):
+        x = close[i]
+
+        # Running window sums
+        sum_5 += x
+        sum_20 += x
+        volume_sum += volume[i]
+        if i >= 5:
+            sum_5 -= close[i - 5]
+        if i >= 20:
+            sum_20 -= close[i - 20]
+            volume_sum -= volume[i - 20]
+        if i >= 4:
+            out[0, i] = sum_5 / 5
+        if i >= 19:
+            sma_20 = sum_20 / 20
+            out[1, i] = sma_20
+            out[7, i] = sma_20
+
+            # Two passes over the window keep the band's variance exact
+            squares = 0.0
+            for j in range(i - 19, i + 1):
+                squares += (close[j] - sma_20) ** 2
+            band = 2.0 * np.sqrt(squares / 19)
+            out[8, i] = sma_20 + band
+            out[9, i] = sma_20 - band
+
+            volume_sma = volume_sum / 20
+            out[12, i] = volume_sma
+            out[13, i] = volume[i] / volume_sma
+
+        # EMAs and MACD (adjust=True weights, so no warm-up NaNs)
+        ema_12, wt_12 = _ewm_step(ema_12, wt_12, x, 1.0 - 2.0 / 13.0, i == 0)
+        ema_26, wt_26 = _ewm_step(ema_26, wt_26, x, 1.0 - 2.0 / 27.0, i == 0)
+        macd = ema_12 - ema_26
+        signal, wt_signal = _ewm_step(signal, wt_signal, macd, 1.0 - 2.0 / 10.0, i == 0)
+        out[2, i] = ema_12
+        out[3, i] = ema_26
+        out[4, i] = macd
+        out[5, i] = signal
+
+        # RSI over 14-day rolling means of gains and losses
+        if i > 0:
+            delta = x - close[i - 1]
+            if delta > 0:
+                gains[i] = delta
+                gain_sum += delta
+                gain_count += 1
+            elif delta < 0:
+                losses[i] = -delta
+                loss_sum -= delta
+                loss_count += 1
+        if i >= 14:
+            if gains[i - 14] > 0:
+                gain_sum -= gains[i - 14]
+                gain_count -= 1
+            if losses[i - 14] > 0:
+                loss_sum -= losses[i - 14]
+                loss_count -= 1
+            if gain_count == 0:
+                gain_sum = 0.0
+            if loss_count == 0:
+                loss_sum = 0.0
+        if i >= 13:
+            rs = (gain_sum / 14) / (loss_sum / 14)
+            out[6, i] = 100.0 - 100.0 / (1.0 + rs)
+
+        # Momentum
+        if i >= 5:
+            out[10, i] = x / close[i - 5] - 1.0
+        if i >= 10:
+            out[11, i] = x / close[i - 10] - 1.0
+
+    return out
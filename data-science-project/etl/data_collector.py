@@ -3,15 +3,24 @@ Data Collector Module
 Handles data collection from multiple sources including APIs and web scraping
 """
 
-import requests
+import asyncio
+import httpx
+import io
+import lxml.html
+import numpy as np
 import pandas as pd
 import json
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
 import time
 import logging
 from typing import Dict, List, Optional
 import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl._stock_kernels import pct_change, rolling_std
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,19 +30,28 @@ class DataCollector:
     """Main data collection class for multiple data sources"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        }
     
-    def collect_covid_data(self) -> pd.DataFrame:
+    def _client(self) -> httpx.AsyncClient:
+        """Create the shared client used for one collection run"""
+        return httpx.AsyncClient(
+            headers=self.headers,
+            http2=True,
+            follow_redirects=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+    
+    async def collect_covid_data(self, client: httpx.AsyncClient) -> pd.DataFrame:
         """Collect COVID-19 data from multiple sources"""
         logger.info("Collecting COVID-19 data...")
         
         try:
             # COVID-19 API (free tier)
             url = "https://disease.sh/v3/covid-19/historical/all?lastdays=30"
-            response = self.session.get(url)
+            response = await client.get(url)
             response.raise_for_status()
             
             data = response.json()
@@ -55,7 +73,7 @@ class DataCollector:
             logger.error(f"Error collecting COVID-19 data: {e}")
             return pd.DataFrame()
     
-    def collect_weather_data(self, city: str = "New York") -> pd.DataFrame:
+    async def collect_weather_data(self, client: httpx.AsyncClient, city: str = "New York") -> pd.DataFrame:
         """Collect weather data using OpenWeatherMap API (free tier)"""
         logger.info(f"Collecting weather data for {city}...")
         
@@ -68,24 +86,31 @@ class DataCollector:
                 'units': 'metric'
             }
             
-            response = self.session.get(url, params=params)
+            response = await client.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
             
-            # Extract weather data
-            weather_data = []
-            for item in data.get('list', []):
-                weather_data.append({
-                    'datetime': pd.to_datetime(item['dt'], unit='s'),
-                    'temperature': item['main']['temp'],
-                    'humidity': item['main']['humidity'],
-                    'pressure': item['main']['pressure'],
-                    'description': item['weather'][0]['description'],
-                    'wind_speed': item['wind']['speed']
-                })
-            
-            df = pd.DataFrame(weather_data)
+            # Extract weather data into preallocated columns
+            items = data.get('list', [])
+            n = len(items)
+            timestamps = np.empty(n, dtype=np.int64)
+            numeric = np.empty((n, 4), dtype=np.float64)
+            descriptions = [None] * n
+            for i, item in enumerate(items):
+                main = item['main']
+                timestamps[i] = item['dt']
+                numeric[i] = (main['temp'], main['humidity'], main['pressure'], item['wind']['speed'])
+                descriptions[i] = item['weather'][0]['description']
+            
+            df = pd.DataFrame({
+                'datetime': pd.to_datetime(timestamps, unit='s'),
+                'temperature': numeric[:, 0],
+                'humidity': numeric[:, 1],
+                'pressure': numeric[:, 2],
+                'description': descriptions,
+                'wind_speed': numeric[:, 3]
+            })
             logger.info(f"Collected {len(df)} weather records")
             return df
             
@@ -93,7 +118,7 @@ class DataCollector:
             logger.error(f"Error collecting weather data: {e}")
             return pd.DataFrame()
     
-    def collect_stock_data(self, symbol: str = "AAPL") -> pd.DataFrame:
+    async def collect_stock_data(self, client: httpx.AsyncClient, symbol: str = "AAPL") -> pd.DataFrame:
         """Collect stock market data using Alpha Vantage API"""
         logger.info(f"Collecting stock data for {symbol}...")
         
@@ -107,7 +132,7 @@ class DataCollector:
                 'outputsize': 'compact'
             }
             
-            response = self.session.get(url, params=params)
+            response = await client.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -115,23 +140,28 @@ class DataCollector:
             # Extract time series data
             time_series = data.get('Time Series (Daily)', {})
             
-            stock_data = []
-            for date, values in time_series.items():
-                stock_data.append({
-                    'date': pd.to_datetime(date),
-                    'open': float(values['1. open']),
-                    'high': float(values['2. high']),
-                    'low': float(values['3. low']),
-                    'close': float(values['4. close']),
-                    'volume': int(values['5. volume'])
-                })
-            
-            df = pd.DataFrame(stock_data)
+            # Parse into preallocated columns, then build the frame in one step
+            n = len(time_series)
+            prices = np.empty((n, 4), dtype=np.float64)
+            volume = np.empty(n, dtype=np.int64)
+            for i, values in enumerate(time_series.values()):
+                prices[i] = (values['1. open'], values['2. high'], values['3. low'], values['4. close'])
+                volume[i] = int(values['5. volume'])
+            
+            df = pd.DataFrame({
+                'date': pd.to_datetime(list(time_series.keys())),
+                'open': prices[:, 0],
+                'high': prices[:, 1],
+                'low': prices[:, 2],
+                'close': prices[:, 3],
+                'volume': volume
+            })
             df = df.sort_values('date').reset_index(drop=True)
             
-            # Add technical indicators
-            df['daily_return'] = df['close'].pct_change()
-            df['volatility'] = df['daily_return'].rolling(window=5).std()
+            # Add technical indicators (compiled loops over the raw arrays)
+            daily_return = pct_change(df['close'].to_numpy(dtype=np.float64))
+            df['daily_return'] = daily_return
+            df['volatility'] = rolling_std(daily_return, 5)
             
             logger.info(f"Collected {len(df)} stock records")
             return df
@@ -140,44 +170,36 @@ class DataCollector:
             logger.error(f"Error collecting stock data: {e}")
             return pd.DataFrame()
     
-    def scrape_public_data(self) -> pd.DataFrame:
+    async def scrape_public_data(self, client: httpx.AsyncClient) -> pd.DataFrame:
         """Scrape additional public data from websites"""
         logger.info("Scraping public data...")
         
         try:
             # Example: Scraping population data from a public source
             url = "https://en.wikipedia.org/wiki/List_of_countries_by_population"
-            response = self.session.get(url)
+            response = await client.get(url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find the main table
-            table = soup.find('table', {'class': 'wikitable'})
-            if not table:
+            # Find the main table (any element with the wikitable class) with libxml2
+            doc = lxml.html.fromstring(response.content)
+            tables = doc.xpath("//table[contains(concat(' ', normalize-space(@class), ' '), ' wikitable ')]")
+            if not tables:
                 return pd.DataFrame()
             
-            # Extract data
-            data = []
-            rows = table.find_all('tr')[1:]  # Skip header
-            
-            for row in rows[:20]:  # Limit to first 20 countries
-                cols = row.find_all(['td', 'th'])
-                if len(cols) >= 3:
-                    try:
-                        country = cols[1].get_text(strip=True)
-                        population = cols[2].get_text(strip=True).replace(',', '')
-                        population = int(population) if population.isdigit() else 0
-                        
-                        data.append({
-                            'country': country,
-                            'population': population,
-                            'scraped_date': datetime.now()
-                        })
-                    except (ValueError, IndexError):
-                        continue
+            table_html = lxml.html.tostring(tables[0], encoding='unicode')
+            table = pd.read_html(io.StringIO(table_html), flavor='lxml')[0].head(20)  # Limit to first 20 countries
+            if table.shape[1] < 3:
+                return pd.DataFrame()
             
-            df = pd.DataFrame(data)
+            # Country and population are the second and third columns
+            population = pd.to_numeric(
+                table.iloc[:, 2].astype(str).str.replace(',', ''), errors='coerce'
+            )
+            df = pd.DataFrame({
+                'country': table.iloc[:, 1].astype(str).str.strip(),
+                'population': population.fillna(0).astype('int64'),
+                'scraped_date': datetime.now()
+            })
             logger.info(f"Scraped {len(df)} public records")
             return df
             
@@ -185,34 +207,30 @@ class DataCollector:
             logger.error(f"Error scraping public data: {e}")
             return pd.DataFrame()
     
-    def collect_all_data(self) -> Dict[str, pd.DataFrame]:
-        """Collect data from all sources"""
+    async def collect_all_data_async(self) -> Dict[str, pd.DataFrame]:
+        """Collect data from all sources concurrently over one pooled client"""
         logger.info("Starting data collection from all sources...")
         
-        data_sources = {}
-        
-        # Collect COVID-19 data
-        covid_data = self.collect_covid_data()
-        if not covid_data.empty:
-            data_sources['covid'] = covid_data
-        
-        # Collect weather data
-        weather_data = self.collect_weather_data()
-        if not weather_data.empty:
-            data_sources['weather'] = weather_data
-        
-        # Collect stock data
-        stock_data = self.collect_stock_data()
-        if not stock_data.empty:
-            data_sources['stock'] = stock_data
+        async with self._client() as client:
+            covid_data, weather_data, stock_data, public_data = await asyncio.gather(
+                self.collect_covid_data(client),
+                self.collect_weather_data(client),
+                self.collect_stock_data(client),
+                self.scrape_public_data(client)
+            )
         
-        # Scrape public data
-        public_data = self.scrape_public_data()
-        if not public_data.empty:
-            data_sources['public'] = public_data
+        data_sources = {}
+        for source_name, df in [('covid', covid_data), ('weather', weather_data),
+                                ('stock', stock_data), ('public', public_data)]:
+            if not df.empty:
+                data_sources[source_name] = df
         
         logger.info(f"Collected data from {len(data_sources)} sources")
         return data_sources
+    
+    def collect_all_data(self) -> Dict[str, pd.DataFrame]:
+        """Collect data from all sources"""
+        return asyncio.run(self.collect_all_data_async())
 
 if __name__ == "__main__":
     collector = DataCollector()
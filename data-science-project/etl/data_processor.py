@@ -3,8 +3,12 @@ Data Processor Module
 Handles data cleaning, transformation, and feature engineering
 """
 
+import bottleneck as bn
 import pandas as pd
+import polars as pl
 import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional, Tuple
@@ -13,8 +17,45 @@ from sklearn.impute import SimpleImputer
 import warnings
 warnings.filterwarnings('ignore')
 
+from etl._stock_kernels import STOCK_INDICATOR_COLUMNS, pct_change, stock_indicators
+
 logger = logging.getLogger(__name__)
 
+# Cleaning method for each source handled by process_all_data
+_CLEANERS = {
+    'covid': 'clean_covid_data',
+    'weather': 'clean_weather_data',
+    'stock': 'clean_stock_data',
+    'public': 'clean_public_data'
+}
+
+# Total rows below which process_all_data cleans serially; smaller inputs clean
+# faster than worker processes start and the frames pickle
+PARALLEL_MIN_ROWS = 1_000_000
+
+# Weather columns screened for outliers with the IQR rule
+WEATHER_NUMERIC_COLS = ['temperature', 'humidity', 'pressure', 'wind_speed']
+
+# Inner edges of the right-closed category bins, with one more label than edges
+POPULATION_EDGES = np.array([10_000_000, 50_000_000, 100_000_000])
+POPULATION_LABELS = ['Small', 'Medium', 'Large', 'Very Large']
+TEMPERATURE_EDGES = np.array([0, 10, 20, 30])
+TEMPERATURE_LABELS = ['Freezing', 'Cold', 'Mild', 'Warm', 'Hot']
+
+def _categorize(values: pd.Series, edges: np.ndarray, labels: List[str]) -> pd.Categorical:
+    """Bin values like pd.cut with right-closed bins and open outer bins, via np.digitize"""
+    values = values.to_numpy(dtype=np.float64)
+    codes = np.digitize(values, edges, right=True)
+    codes[np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+def _move_mean(values: pd.Series, window: int) -> np.ndarray:
+    """Trailing mean matching Series.rolling(window).mean(), via bottleneck's running sum"""
+    values = values.to_numpy(dtype=np.float64)
+    if len(values) < window:
+        return np.full(len(values), np.nan)
+    return bn.move_mean(values, window=window, min_count=window)
+
 class DataProcessor:
     """Main data processing class for cleaning and transforming data"""
     
@@ -30,11 +71,8 @@ class DataProcessor:
         if df.empty:
             return df
         
-        # Create a copy to avoid modifying original
-        df_clean = df.copy()
-        
-        # Handle missing values
-        df_clean = df_clean.fillna(0)
+        # Handle missing values (fillna returns a new frame, so the original is untouched)
+        df_clean = df.fillna(0)
         
         # Remove negative values (data errors)
         numeric_cols = ['cases', 'deaths', 'recovered', 'new_cases', 'new_deaths', 'new_recovered']
@@ -42,26 +80,23 @@ class DataProcessor:
             if col in df_clean.columns:
                 df_clean[col] = df_clean[col].clip(lower=0)
         
-        # Add derived features
-        df_clean['case_fatality_rate'] = np.where(
-            df_clean['cases'] > 0,
-            df_clean['deaths'] / df_clean['cases'] * 100,
-            0
-        )
-        
-        df_clean['recovery_rate'] = np.where(
-            df_clean['cases'] > 0,
-            df_clean['recovered'] / df_clean['cases'] * 100,
-            0
-        )
+        # Add derived features; the masked divide skips rows without cases (rate 0)
+        # instead of computing inf/NaN there and discarding it
+        cases = df_clean['cases'].to_numpy(dtype=np.float64)
+        has_cases = cases > 0
+        for rate_col, col in (('case_fatality_rate', 'deaths'), ('recovery_rate', 'recovered')):
+            rate = np.zeros(len(cases))
+            np.divide(df_clean[col].to_numpy(dtype=np.float64), cases, out=rate, where=has_cases)
+            rate *= 100
+            df_clean[rate_col] = rate
         
         # Add rolling averages
-        df_clean['cases_7d_avg'] = df_clean['cases'].rolling(window=7).mean()
-        df_clean['deaths_7d_avg'] = df_clean['deaths'].rolling(window=7).mean()
+        df_clean['cases_7d_avg'] = _move_mean(df_clean['cases'], 7)
+        df_clean['deaths_7d_avg'] = _move_mean(df_clean['deaths'], 7)
         
-        # Add growth rates
-        df_clean['cases_growth_rate'] = df_clean['cases'].pct_change()
-        df_clean['deaths_growth_rate'] = df_clean['deaths'].pct_change()
+        # Add growth rates (one compiled pass per column; no gaps left after fillna)
+        df_clean['cases_growth_rate'] = pct_change(df_clean['cases'].to_numpy(dtype=np.float64))
+        df_clean['deaths_growth_rate'] = pct_change(df_clean['deaths'].to_numpy(dtype=np.float64))
         
         logger.info(f"Cleaned COVID-19 data: {len(df_clean)} records")
         return df_clean
@@ -73,21 +108,18 @@ class DataProcessor:
         if df.empty:
             return df
         
-        df_clean = df.copy()
+        # Handle missing values (dropna returns a new frame, so no copy first)
+        df_clean = df.dropna()
         
-        # Handle missing values
-        df_clean = df_clean.dropna()
-        
-        # Remove outliers using IQR method
-        numeric_cols = ['temperature', 'humidity', 'pressure', 'wind_speed']
-        for col in numeric_cols:
-            if col in df_clean.columns:
-                Q1 = df_clean[col].quantile(0.25)
-                Q3 = df_clean[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                df_clean = df_clean[(df_clean[col] >= lower_bound) & (df_clean[col] <= upper_bound)]
+        # Remove outliers using IQR method, with one quantile pass and one combined row mask
+        numeric_cols = [col for col in WEATHER_NUMERIC_COLS if col in df_clean.columns]
+        if numeric_cols and len(df_clean):
+            values = df_clean[numeric_cols].to_numpy(dtype=np.float64)
+            Q1, Q3 = np.quantile(values, [0.25, 0.75], axis=0)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - 1.5 * IQR
+            upper_bound = Q3 + 1.5 * IQR
+            df_clean = df_clean[((values >= lower_bound) & (values <= upper_bound)).all(axis=1)]
         
         # Add derived features
         df_clean['temp_fahrenheit'] = df_clean['temperature'] * 9/5 + 32
@@ -98,10 +130,13 @@ class DataProcessor:
         df_clean['day_of_week'] = df_clean['datetime'].dt.dayofweek
         df_clean['month'] = df_clean['datetime'].dt.month
         
-        # Encode weather descriptions
+        # Encode weather descriptions with a hash-based categorical factorization; the
+        # (sorted) categories become the fitted encoder's classes_, as fit_transform would
         if 'description' in df_clean.columns:
+            descriptions = df_clean['description'].astype('category')
+            df_clean['weather_code'] = descriptions.cat.codes.to_numpy(dtype=np.int64)
             le = LabelEncoder()
-            df_clean['weather_code'] = le.fit_transform(df_clean['description'])
+            le.classes_ = descriptions.cat.categories.to_numpy()
             self.label_encoders['weather_description'] = le
         
         logger.info(f"Cleaned weather data: {len(df_clean)} records")
@@ -114,44 +149,21 @@ class DataProcessor:
         if df.empty:
             return df
         
-        df_clean = df.copy()
-        
-        # Handle missing values
-        df_clean = df_clean.dropna()
+        # Handle missing values (dropna already returns a new frame, so no copy first)
+        df_clean = df.dropna()
         
         # Remove outliers (extreme price movements)
-        df_clean = df_clean[df_clean['daily_return'].abs() < 0.5]  # Remove >50% daily moves
-        
-        # Add technical indicators
-        df_clean['sma_5'] = df_clean['close'].rolling(window=5).mean()
-        df_clean['sma_20'] = df_clean['close'].rolling(window=20).mean()
-        df_clean['ema_12'] = df_clean['close'].ewm(span=12).mean()
-        df_clean['ema_26'] = df_clean['close'].ewm(span=26).mean()
-        
-        # MACD
-        df_clean['macd'] = df_clean['ema_12'] - df_clean['ema_26']
-        df_clean['macd_signal'] = df_clean['macd'].ewm(span=9).mean()
-        
-        # RSI
-        delta = df_clean['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df_clean['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        df_clean['bb_middle'] = df_clean['close'].rolling(window=20).mean()
-        bb_std = df_clean['close'].rolling(window=20).std()
-        df_clean['bb_upper'] = df_clean['bb_middle'] + (bb_std * 2)
-        df_clean['bb_lower'] = df_clean['bb_middle'] - (bb_std * 2)
-        
-        # Price momentum
-        df_clean['momentum_5'] = df_clean['close'] / df_clean['close'].shift(5) - 1
-        df_clean['momentum_10'] = df_clean['close'] / df_clean['close'].shift(10) - 1
-        
-        # Volume indicators
-        df_clean['volume_sma'] = df_clean['volume'].rolling(window=20).mean()
-        df_clean['volume_ratio'] = df_clean['volume'] / df_clean['volume_sma']
+        daily_return = df_clean['daily_return'].to_numpy(dtype=np.float64)
+        df_clean = df_clean[np.abs(daily_return) < 0.5]  # Remove >50% daily moves
+        
+        # Work on bare contiguous arrays rather than Series
+        close = np.ascontiguousarray(df_clean['close'].to_numpy(dtype=np.float64))
+        volume = np.ascontiguousarray(df_clean['volume'].to_numpy(dtype=np.float64))
+        
+        # Add technical indicators (SMA, EMA, MACD, RSI, Bollinger Bands, momentum
+        # and volume) in one compiled pass, then attach every column in one call
+        indicators = stock_indicators(close, volume)
+        df_clean = df_clean.assign(**dict(zip(STOCK_INDICATOR_COLUMNS, indicators)))
         
         logger.info(f"Cleaned stock data: {len(df_clean)} records")
         return df_clean
@@ -163,25 +175,24 @@ class DataProcessor:
         if df.empty:
             return df
         
-        df_clean = df.copy()
-        
-        # Handle missing values
-        df_clean = df_clean.dropna()
-        
-        # Remove rows with invalid population data
-        df_clean = df_clean[df_clean['population'] > 0]
-        
-        # Add derived features
-        df_clean['population_millions'] = df_clean['population'] / 1_000_000
-        df_clean['log_population'] = np.log(df_clean['population'])
-        
-        # Add population categories
-        df_clean['population_category'] = pd.cut(
-            df_clean['population'],
-            bins=[0, 10_000_000, 50_000_000, 100_000_000, float('inf')],
-            labels=['Small', 'Medium', 'Large', 'Very Large']
+        # Handle missing values, remove rows with invalid population data and add
+        # derived features as one lazy Polars query
+        df_clean = (
+            pl.from_pandas(df)
+            .lazy()
+            .drop_nulls()
+            .filter(pl.col('population') > 0)
+            .with_columns(
+                (pl.col('population') / 1_000_000).alias('population_millions'),
+                pl.col('population').log().alias('log_population')
+            )
+            .collect()
+            .to_pandas()
         )
         
+        # Add population categories (populations are positive after the filter above)
+        df_clean['population_category'] = _categorize(df_clean['population'], POPULATION_EDGES, POPULATION_LABELS)
+        
         logger.info(f"Cleaned public data: {len(df_clean)} records")
         return df_clean
     
@@ -189,7 +200,8 @@ class DataProcessor:
         """Create additional features for machine learning"""
         logger.info(f"Creating features for {data_type} data...")
         
-        df_features = df.copy()
+        # Only new columns are added, so a shallow copy leaves the input untouched
+        df_features = df.copy(deep=False)
         
         if data_type == 'covid':
             # Time-based features
@@ -217,17 +229,15 @@ class DataProcessor:
             df_features['quarter'] = df_features['date'].dt.quarter
             
         elif data_type == 'weather':
-            # Seasonal features
-            df_features['is_summer'] = df_features['month'].isin([6, 7, 8]).astype(int)
-            df_features['is_winter'] = df_features['month'].isin([12, 1, 2]).astype(int)
-            df_features['is_weekend'] = df_features['day_of_week'].isin([5, 6]).astype(int)
+            # Seasonal features, as int8 flags from plain range comparisons
+            month = df_features['month'].to_numpy()
+            day_of_week = df_features['day_of_week'].to_numpy()
+            df_features['is_summer'] = ((month >= 6) & (month <= 8)).astype(np.int8)
+            df_features['is_winter'] = ((month == 12) | (month <= 2)).astype(np.int8)
+            df_features['is_weekend'] = (day_of_week >= 5).astype(np.int8)
             
             # Temperature categories
-            df_features['temp_category'] = pd.cut(
-                df_features['temperature'],
-                bins=[-float('inf'), 0, 10, 20, 30, float('inf')],
-                labels=['Freezing', 'Cold', 'Mild', 'Warm', 'Hot']
-            )
+            df_features['temp_category'] = _categorize(df_features['temperature'], TEMPERATURE_EDGES, TEMPERATURE_LABELS)
         
         return df_features
     
@@ -239,9 +249,9 @@ class DataProcessor:
         # Remove rows with missing target
         df_ml = df.dropna(subset=[target_col])
         
-        # Select features and target
-        X = df_ml[feature_cols].copy()
-        y = df_ml[target_col]
+        # Select features and target as C-contiguous float32 (row-major, half the memory traffic)
+        X = np.ascontiguousarray(df_ml[feature_cols].to_numpy(dtype=np.float32))
+        y = df_ml[target_col].to_numpy(dtype=np.float32)
         
         # Handle missing values in features
         imputer = SimpleImputer(strategy='mean')
@@ -256,36 +266,46 @@ class DataProcessor:
         self.imputers[f'{target_col}_imputer'] = imputer
         
         logger.info(f"Prepared ML data: {X_scaled.shape[0]} samples, {X_scaled.shape[1]} features")
-        return X_scaled, y.values
+        return X_scaled, y
     
     def process_all_data(self, data_sources: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
         """Process all data sources"""
         logger.info("Processing all data sources...")
         
         processed_data = {}
-        
-        for source_name, df in data_sources.items():
-            if df.empty:
-                continue
-                
-            if source_name == 'covid':
-                processed_data[source_name] = self.clean_covid_data(df)
-            elif source_name == 'weather':
-                processed_data[source_name] = self.clean_weather_data(df)
-            elif source_name == 'stock':
-                processed_data[source_name] = self.clean_stock_data(df)
-            elif source_name == 'public':
-                processed_data[source_name] = self.clean_public_data(df)
-            
-            # Add features
-            if source_name in processed_data:
-                processed_data[source_name] = self.create_features(
-                    processed_data[source_name], source_name
-                )
+        jobs = {
+            source_name: df for source_name, df in data_sources.items()
+            if not df.empty and source_name in _CLEANERS
+        }
+        if not jobs:
+            logger.info("Processed 0 data sources")
+            return processed_data
+        
+        workers = min(len(jobs), os.cpu_count() or 1)
+        if workers > 1 and sum(len(df) for df in jobs.values()) >= PARALLEL_MIN_ROWS:
+            # Sources are independent, so large inputs are cleaned in parallel worker processes
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    source_name: executor.submit(_process_source, source_name, df)
+                    for source_name, df in jobs.items()
+                }
+                results = {source_name: future.result() for source_name, future in futures.items()}
+        else:
+            results = {source_name: _process_source(source_name, df) for source_name, df in jobs.items()}
+        
+        for source_name, (df_processed, label_encoders) in results.items():
+            processed_data[source_name] = df_processed
+            self.label_encoders.update(label_encoders)
         
         logger.info(f"Processed {len(processed_data)} data sources")
         return processed_data
 
+def _process_source(source_name: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, LabelEncoder]]:
+    """Clean one source and add its features, returning the label encoders fitted on the way"""
+    processor = DataProcessor()
+    df_clean = getattr(processor, _CLEANERS[source_name])(df)
+    return processor.create_features(df_clean, source_name), processor.label_encoders
+
 if __name__ == "__main__":
     # Test the processor
     processor = DataProcessor()
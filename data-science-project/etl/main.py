@@ -8,8 +8,10 @@ import os
 import logging
 from datetime import datetime
 import pandas as pd
-import json
+import pyarrow as pa
+import pyarrow.feather as feather
 import numpy as np
+import orjson
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -29,6 +31,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Processed data formats read back for training, fastest first
+PROCESSED_FORMATS = ('.feather', '.parquet', '.csv')
+
 class ETLPipeline:
     """Main ETL pipeline class"""
     
@@ -41,6 +46,21 @@ class ETLPipeline:
         os.makedirs('../data', exist_ok=True)
         os.makedirs('../models', exist_ok=True)
     
+    def _save_feather(self, df: pd.DataFrame, csv_filepath: str):
+        """Write an uncompressed Arrow IPC (Feather) copy of df next to its CSV file, for memory-mapped reloads"""
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            feather.write_feather(table, csv_filepath.replace('.csv', '.feather'), compression='uncompressed')
+        except Exception as e:
+            logger.warning(f"Could not save Feather copy of {csv_filepath}: {e}")
+    
+    def _save_parquet(self, df: pd.DataFrame, csv_filepath: str):
+        """Write a zstd-compressed Parquet copy of df next to its CSV file"""
+        try:
+            df.to_parquet(csv_filepath.replace('.csv', '.parquet'), engine='pyarrow', compression='zstd', index=False)
+        except Exception as e:
+            logger.warning(f"Could not save Parquet copy of {csv_filepath}: {e}")
+    
     def run_full_pipeline(self) -> dict:
         """Run the complete ETL pipeline"""
         logger.info("Starting full ETL pipeline...")
@@ -69,6 +89,7 @@ class ETLPipeline:
                 if not df.empty:
                     raw_filepath = f"../data/raw_{source_name}_{datetime.now().strftime('%Y%m%d')}.csv"
                     df.to_csv(raw_filepath, index=False)
+                    self._save_parquet(df, raw_filepath)
                     logger.info(f"Saved raw {source_name} data: {len(df)} records")
             
             # Step 2: Process and clean data
@@ -79,6 +100,11 @@ class ETLPipeline:
                 if not df.empty:
                     processed_filepath = f"../data/processed_{source_name}_{datetime.now().strftime('%Y%m%d')}.csv"
                     df.to_csv(processed_filepath, index=False)
+                    
+                    # Columnar copies for the analytics endpoints and model retraining
+                    self._save_parquet(df, processed_filepath)
+                    self._save_feather(df, processed_filepath)
+                    
                     logger.info(f"Saved processed {source_name} data: {len(df)} records")
             
             # Step 3: Train machine learning models
@@ -103,8 +129,12 @@ class ETLPipeline:
             
             # Step 6: Save pipeline results
             results_filepath = f"../data/pipeline_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(results_filepath, 'w') as f:
-                json.dump(pipeline_results, f, indent=2, default=str)
+            with open(results_filepath, 'wb') as f:
+                f.write(orjson.dumps(
+                    pipeline_results,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                ))
             
             logger.info("ETL pipeline completed successfully!")
             
@@ -133,24 +163,17 @@ class ETLPipeline:
                 'missing_values': {}
             }
             
-            # Numeric summary
+            # Numeric summary, aggregated for all columns in one call
             numeric_cols = df.select_dtypes(include=[np.number]).columns
-            for col in numeric_cols:
-                source_insights['numeric_summary'][col] = {
-                    'mean': float(df[col].mean()),
-                    'std': float(df[col].std()),
-                    'min': float(df[col].min()),
-                    'max': float(df[col].max()),
-                    'median': float(df[col].median())
-                }
+            stats = df[numeric_cols].agg(['mean', 'std', 'min', 'max', 'median'])
+            source_insights['numeric_summary'] = stats.to_dict()
             
-            # Missing values
-            for col in df.columns:
-                missing_count = df[col].isnull().sum()
+            # Missing values (numpy scalars are left for orjson to encode)
+            for col, missing_count in df.isnull().sum().items():
                 if missing_count > 0:
                     source_insights['missing_values'][col] = {
-                        'count': int(missing_count),
-                        'percentage': float(missing_count / len(df) * 100)
+                        'count': missing_count,
+                        'percentage': missing_count / len(df) * 100
                     }
             
             # Source-specific insights
@@ -210,6 +233,7 @@ class ETLPipeline:
                 if not df.empty:
                     filepath = f"../data/raw_{source_name}_{datetime.now().strftime('%Y%m%d')}.csv"
                     df.to_csv(filepath, index=False)
+                    self._save_parquet(df, filepath)
                     logger.info(f"Saved {source_name} data: {len(df)} records")
             
             return results
@@ -227,19 +251,32 @@ class ETLPipeline:
             processed_data = {}
             data_dir = '../data'
             
-            for filename in os.listdir(data_dir):
-                if filename.startswith('processed_') and filename.endswith('.csv'):
-                    source_name = filename.replace('processed_', '').replace('.csv', '').split('_')[0]
-                    filepath = os.path.join(data_dir, filename)
+            filenames = set(os.listdir(data_dir))
+            for filename in sorted(filenames):
+                stem, ext = os.path.splitext(filename)
+                if not filename.startswith('processed_') or ext not in PROCESSED_FORMATS:
+                    continue
+                if ext != next(fmt for fmt in PROCESSED_FORMATS if stem + fmt in filenames):
+                    continue  # Read each data set once, from its fastest copy
+                
+                source_name = stem.replace('processed_', '').split('_')[0]
+                filepath = os.path.join(data_dir, filename)
+                if ext == '.feather':
+                    # Memory-mapped Arrow IPC, no parsing and dtypes preserved
+                    df = feather.read_table(filepath, memory_map=True).to_pandas()
+                elif ext == '.parquet':
+                    # Parquet keeps the column dtypes, dates included
+                    df = pd.read_parquet(filepath)
+                else:
                     df = pd.read_csv(filepath)
                     
-                    # Convert date columns
+                    # Convert date columns (written as ISO 8601, so pandas' C parser applies)
                     date_cols = ['date', 'datetime']
                     for col in date_cols:
                         if col in df.columns:
-                            df[col] = pd.to_datetime(df[col])
-                    
-                    processed_data[source_name] = df
+                            df[col] = pd.to_datetime(df[col], format='ISO8601', cache=True)
+                
+                processed_data[source_name] = df
             
             if not processed_data:
                 logger.warning("No processed data found for model training")
@@ -264,6 +301,19 @@ class ETLPipeline:
             logger.error(f"Error in model training: {e}")
             return {'status': 'failed', 'error': str(e)}
 
+def run(mode: str = 'full') -> dict:
+    """Run one pipeline mode ('full', 'collect' or 'train') and return its results"""
+    pipeline = ETLPipeline()
+    
+    if mode == 'full':
+        return pipeline.run_full_pipeline()
+    elif mode == 'collect':
+        return pipeline.run_data_collection_only()
+    elif mode == 'train':
+        return pipeline.run_model_training_only()
+    
+    raise ValueError(f"Unknown pipeline mode: {mode}")
+
 def main():
     """Main function to run the ETL pipeline"""
     import argparse
@@ -274,14 +324,7 @@ def main():
     
     args = parser.parse_args()
     
-    pipeline = ETLPipeline()
-    
-    if args.mode == 'full':
-        results = pipeline.run_full_pipeline()
-    elif args.mode == 'collect':
-        results = pipeline.run_data_collection_only()
-    elif args.mode == 'train':
-        results = pipeline.run_model_training_only()
+    results = run(args.mode)
     
     print(f"Pipeline completed with status: {results.get('status', 'unknown')}")
     
@@ -0,0 +1,19 @@
+"""
+Prediction Kernels
+Numba-compiled loops for preparing feature matrices at prediction time
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, error_model='numpy', nogil=True)
+def nan_fill(X: np.ndarray, means: np.ndarray) -> int:
+    """Replace NaNs in a 2D float array in place with the matching column mean, returning how many were filled"""
+    filled = 0
+    for i in range(X.shape[0]):
+        for j in range(X.shape[1]):
+            if np.isnan(X[i, j]):
+                X[i, j] = means[j]
+                filled += 1
+    return filled
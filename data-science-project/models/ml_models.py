@@ -9,18 +9,124 @@ from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 import joblib
+from joblib import Parallel, delayed
 import json
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.svm import SVR, SVC
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.metrics import mean_squared_error, r2_score, accuracy_score, classification_report
+from sklearn.svm import LinearSVR, LinearSVC
+from sklearn.model_selection import cross_val_predict, cross_validate, GridSearchCV, TimeSeriesSplit
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 import xgboost as xgb
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models._prediction_kernels import nan_fill
 
 logger = logging.getLogger(__name__)
 
+# Temperature bands (°C, right-inclusive) for the weather classification target
+WEATHER_CATEGORY_EDGES = [0, 15, 25]
+WEATHER_CATEGORY_LABELS = np.array(['Cold', 'Cool', 'Warm', 'Hot'])
+
+# Training matrices are float32: half the memory traffic for the forest and histogram builders
+FEATURE_DTYPE = 'float32'
+
+# Candidate features per model, in training column order
+COVID_FEATURES = (
+    'cases', 'deaths', 'recovered', 'new_cases', 'new_deaths',
+    'case_fatality_rate', 'recovery_rate', 'cases_7d_avg',
+    'deaths_7d_avg', 'cases_growth_rate', 'deaths_growth_rate',
+    'day_of_year', 'week_of_year', 'month'
+)
+STOCK_FEATURES = (
+    'open', 'high', 'low', 'volume', 'daily_return', 'volatility',
+    'sma_5', 'sma_20', 'ema_12', 'ema_26', 'macd', 'macd_signal',
+    'rsi', 'bb_middle', 'bb_upper', 'bb_lower', 'momentum_5',
+    'momentum_10', 'volume_sma', 'volume_ratio', 'price_change',
+    'price_change_pct', 'high_low_ratio', 'close_open_ratio',
+    'day_of_week', 'month', 'quarter'
+)
+WEATHER_FEATURES = (
+    'temperature', 'humidity', 'pressure', 'wind_speed',
+    'temp_fahrenheit', 'hour', 'day_of_week', 'month',
+    'is_summer', 'is_winter', 'is_weekend'
+)
+
+def _detect_xgb_device() -> str:
+    """Return 'cuda' when XGBoost was built with CUDA and a GPU is visible, otherwise 'cpu'"""
+    try:
+        if not xgb.build_info().get('USE_CUDA'):
+            return 'cpu'
+        import cupy
+        return 'cuda' if cupy.cuda.runtime.getDeviceCount() > 0 else 'cpu'
+    except Exception:
+        return 'cpu'
+
+# Folds used to score every candidate model
+CV_FOLDS = 5
+
+def _time_series_folds(n_rows: int) -> TimeSeriesSplit:
+    """Expanding-window folds that always test on later rows, with at least two rows per test fold"""
+    # Unlike a shuffled split, no fold trains on days after the ones it is scored on
+    return TimeSeriesSplit(n_splits=min(CV_FOLDS, n_rows // 2 - 1))
+
+def _cv_regression_metrics(model, X, y, cv) -> Dict[str, float]:
+    """Fold-averaged MSE, R² and RMSE of a regressor"""
+    scores = cross_validate(
+        model, X, y, cv=cv, scoring=('r2', 'neg_mean_squared_error'), n_jobs=-1, error_score='raise'
+    )
+    mse = -scores['test_neg_mean_squared_error'].mean()
+    return {
+        'mse': mse,
+        'r2': scores['test_r2'].mean(),
+        'rmse': np.sqrt(mse)
+    }
+
+def _classification_metrics(y_true, y_pred, class_names: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Accuracy and per-class report of classifier predictions, reported by name for integer classes"""
+    if class_names is not None:
+        y_true, y_pred = class_names[y_true], class_names[y_pred]
+    return {
+        'accuracy': accuracy_score(y_true, y_pred),
+        'classification_report': classification_report(y_true, y_pred, output_dict=True)
+    }
+
+def _cv_classification_metrics(model, X, y, cv, class_names: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Accuracy and per-class report of a classifier's out-of-fold predictions"""
+    return _classification_metrics(y, cross_val_predict(model, X, y, cv=cv, n_jobs=-1), class_names)
+
+def _present(features, columns) -> List[str]:
+    """Features found among columns, keeping the order of features"""
+    # Index membership is a linear scan per lookup; one set makes it constant time
+    columns = set(columns)
+    return [col for col in features if col in columns]
+
+def _ranked_importances(features, importances) -> Dict[str, np.ndarray]:
+    """Feature names and float32 importances sorted from most to least important, ties in feature order"""
+    importances = np.asarray(importances, dtype=np.float32)
+    order = np.argsort(-importances, kind='stable')
+    return {'features': np.asarray(features)[order], 'importances': importances[order]}
+
+def _next_day_xy(df: pd.DataFrame, features: List[str], target: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Pair each row's features with the next row's target, dropping pairs with missing values"""
+    # Offset slices of a C-contiguous matrix are views, so the gap-free case copies nothing more
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=FEATURE_DTYPE))[:-1]
+    y = df[target].to_numpy(dtype=np.float64)[1:]
+    keep = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    if keep.all():
+        return X, y
+    return X[keep], y[keep]
+
 class MLModels:
     """Main machine learning class for training and evaluating models"""
     
@@ -28,6 +134,59 @@ class MLModels:
         self.models = {}
         self.model_metadata = {}
         self.feature_importance = {}
+        # Guards the dicts above while train_all_models trains data types concurrently
+        self._lock = threading.Lock()
+        # Detected once; falls back to 'cpu' for good if a GPU fit fails
+        self._xgb_device = _detect_xgb_device()
+    
+    def _xgb_regressor(self) -> xgb.XGBRegressor:
+        """XGBoost regressor on the detected device, single-threaded until its final fit"""
+        # With tree_method='hist' the sklearn wrapper bins each fit's input into a QuantileDMatrix
+        # itself, so the estimator API keeps CV cloning and joblib saving without raw xgb.train.
+        # n_jobs=1 keeps each CV fold to one OpenMP thread, which joblib's nesting cannot limit
+        return xgb.XGBRegressor(
+            n_estimators=100, random_state=42, tree_method='hist', device=self._xgb_device, n_jobs=1
+        )
+    
+    def _with_cpu_fallback(self, model, step):
+        """Run step(model), retrying XGBoost on the CPU when the GPU run fails"""
+        try:
+            return step(model)
+        except Exception as e:
+            if not isinstance(model, xgb.XGBModel) or model.get_params().get('device') == 'cpu':
+                raise
+            logger.warning(f"XGBoost GPU training failed, retrying on CPU: {e}")
+            self._xgb_device = 'cpu'
+            return step(model.set_params(device='cpu'))
+    
+    def _fit(self, model, X, y):
+        """Fit a model on every core, retrying XGBoost on the CPU when the GPU fit fails"""
+        if isinstance(model, xgb.XGBModel):
+            # Cross-validation ran single-threaded; the final fit gets every core back
+            model.set_params(n_jobs=None)
+        return self._with_cpu_fallback(model, lambda m: m.fit(X, y))
+    
+    def _score_candidate(self, name, model, X, y, metric, cv):
+        """Cross-validate one candidate, returning (name, model, metrics) or None on failure"""
+        try:
+            return name, model, self._with_cpu_fallback(model, lambda m: metric(m, X, y, cv))
+        except Exception as e:
+            logger.error(f"Error training {name}: {e}")
+            return None
+    
+    def _score_candidates(self, models, X, y, metric, cv=CV_FOLDS) -> List[Tuple[str, Any, Dict[str, Any]]]:
+        """Cross-validate candidate models concurrently, returning (name, model, metrics) for each one that trained"""
+        # Threads rather than processes: the forests and XGBoost release the GIL while fitting,
+        # and the training arrays are shared instead of pickled to workers. The CV folds nested
+        # below run as threads too, and every fold fit is single-threaded: joblib runs a forest's
+        # own n_jobs sequentially at that depth and XGBoost is built with n_jobs=1. With
+        # train_all_models running three trainers at once, that still allows up to
+        # trainers x candidates x folds busy threads, so expect more threads than cores
+        scored = Parallel(n_jobs=-1, backend='threading')(
+            delayed(self._score_candidate)(name, model, X, y, metric, cv)
+            for name, model in models.items()
+        )
+        return [candidate for candidate in scored if candidate is not None]
     
     def train_covid_forecasting_model(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Train COVID-19 forecasting model"""
@@ -37,87 +196,61 @@ class MLModels:
             logger.warning("Insufficient data for COVID-19 model training")
             return {}
         
-        # Prepare features for COVID forecasting
-        feature_cols = [
-            'cases', 'deaths', 'recovered', 'new_cases', 'new_deaths',
-            'case_fatality_rate', 'recovery_rate', 'cases_7d_avg',
-            'deaths_7d_avg', 'cases_growth_rate', 'deaths_growth_rate',
-            'day_of_year', 'week_of_year', 'month'
-        ]
-        
-        # Use available features
-        available_features = [col for col in feature_cols if col in df.columns]
+        # Use available features for COVID forecasting
+        available_features = _present(COVID_FEATURES, df.columns)
         
         if len(available_features) < 3:
             logger.warning("Insufficient features for COVID-19 model")
             return {}
         
         # Target: predict next day's cases
-        df_model = df.copy()
-        df_model['target_cases'] = df_model['cases'].shift(-1)
-        df_model = df_model.dropna()
+        X, y = _next_day_xy(df, available_features, 'cases')
         
-        if len(df_model) < 10:
+        if len(X) < 10:
             logger.warning("Insufficient data after target creation")
             return {}
         
-        X = df_model[available_features]
-        y = df_model['target_cases']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
         # Train multiple models
         models = {
-            'random_forest': RandomForestRegressor(n_estimators=100, random_state=42),
+            'random_forest': RandomForestRegressor(n_estimators=100, n_jobs=-1, max_samples=0.5, random_state=42),
             'linear_regression': LinearRegression(),
-            'xgboost': xgb.XGBRegressor(n_estimators=100, random_state=42)
+            'xgboost': self._xgb_regressor()
         }
         
+        best_name = None
         best_model = None
         best_score = -float('inf')
         results = {}
         
-        for name, model in models.items():
-            try:
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-                
-                mse = mean_squared_error(y_test, y_pred)
-                r2 = r2_score(y_test, y_pred)
-                
-                results[name] = {
-                    'mse': mse,
-                    'r2': r2,
-                    'rmse': np.sqrt(mse)
-                }
-                
-                if r2 > best_score:
-                    best_score = r2
-                    best_model = model
-                    
-            except Exception as e:
-                logger.error(f"Error training {name}: {e}")
-                continue
+        for name, model, metrics in self._score_candidates(models, X, y, _cv_regression_metrics, _time_series_folds(len(X))):
+            results[name] = metrics
+            if metrics['r2'] > best_score:
+                best_score = metrics['r2']
+                best_name = name
+                best_model = model
         
         if best_model is None:
             logger.warning("No models trained successfully")
             return {}
         
-        # Store best model
-        self.models['covid_forecast'] = best_model
-        self.model_metadata['covid_forecast'] = {
-            'features': available_features,
-            'best_model': list(results.keys())[list(results.values()).index(max(results.values(), key=lambda x: x['r2']))],
-            'performance': results,
-            'trained_date': datetime.now().isoformat()
-        }
-        
-        # Feature importance for tree-based models
-        if hasattr(best_model, 'feature_importances_'):
-            self.feature_importance['covid_forecast'] = dict(zip(available_features, best_model.feature_importances_))
+        # Cross-validation only scored clones; fit the winner once on every row
+        self._fit(best_model, X, y)
+        
+        # Store best model; data types may be training on other threads
+        with self._lock:
+            self.models['covid_forecast'] = best_model
+            self.model_metadata['covid_forecast'] = {
+                'features': available_features,
+                'dtype': FEATURE_DTYPE,
+                'feature_means': X.mean(axis=0, dtype=np.float64).astype(FEATURE_DTYPE),
+                'best_model': best_name,
+                'performance': results,
+                'trained_date': datetime.now().isoformat()
+            }
+            
+            # Feature importance for tree-based models
+            if hasattr(best_model, 'feature_importances_'):
+                self.feature_importance['covid_forecast'] = _ranked_importances(available_features, best_model.feature_importances_)
         
         logger.info(f"COVID-19 model trained with R² = {best_score:.3f}")
         return results
@@ -131,87 +264,65 @@ class MLModels:
             return {}
         
         # Prepare features for stock prediction
-        feature_cols = [
-            'open', 'high', 'low', 'volume', 'daily_return', 'volatility',
-            'sma_5', 'sma_20', 'ema_12', 'ema_26', 'macd', 'macd_signal',
-            'rsi', 'bb_middle', 'bb_upper', 'bb_lower', 'momentum_5',
-            'momentum_10', 'volume_sma', 'volume_ratio', 'price_change',
-            'price_change_pct', 'high_low_ratio', 'close_open_ratio',
-            'day_of_week', 'month', 'quarter'
-        ]
-        
-        available_features = [col for col in feature_cols if col in df.columns]
+        available_features = _present(STOCK_FEATURES, df.columns)
         
         if len(available_features) < 5:
             logger.warning("Insufficient features for stock model")
             return {}
         
         # Target: predict next day's close price
-        df_model = df.copy()
-        df_model['target_close'] = df_model['close'].shift(-1)
-        df_model = df_model.dropna()
+        X, y = _next_day_xy(df, available_features, 'close')
         
-        if len(df_model) < 20:
+        if len(X) < 20:
             logger.warning("Insufficient data after target creation")
             return {}
         
-        X = df_model[available_features]
-        y = df_model['target_close']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
         # Train models
         models = {
-            'random_forest': RandomForestRegressor(n_estimators=100, random_state=42),
-            'xgboost': xgb.XGBRegressor(n_estimators=100, random_state=42),
-            'svr': SVR(kernel='rbf')
+            'random_forest': RandomForestRegressor(n_estimators=100, n_jobs=-1, max_samples=0.5, random_state=42),
+            'xgboost': self._xgb_regressor(),
+            # LIBLINEAR trains in linear time where the RBF kernel grew quadratically with rows;
+            # scaling evens out the mixed price and volume ranges
+            'svr': Pipeline([
+                ('scaler', StandardScaler(with_mean=False)),
+                ('svm', LinearSVR(C=1.0, dual='auto', max_iter=5000, random_state=42))
+            ])
         }
         
+        best_name = None
         best_model = None
         best_score = -float('inf')
         results = {}
         
-        for name, model in models.items():
-            try:
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-                
-                mse = mean_squared_error(y_test, y_pred)
-                r2 = r2_score(y_test, y_pred)
-                
-                results[name] = {
-                    'mse': mse,
-                    'r2': r2,
-                    'rmse': np.sqrt(mse)
-                }
-                
-                if r2 > best_score:
-                    best_score = r2
-                    best_model = model
-                    
-            except Exception as e:
-                logger.error(f"Error training {name}: {e}")
-                continue
+        for name, model, metrics in self._score_candidates(models, X, y, _cv_regression_metrics, _time_series_folds(len(X))):
+            results[name] = metrics
+            if metrics['r2'] > best_score:
+                best_score = metrics['r2']
+                best_name = name
+                best_model = model
         
         if best_model is None:
             logger.warning("No stock models trained successfully")
             return {}
         
-        # Store best model
-        self.models['stock_prediction'] = best_model
-        self.model_metadata['stock_prediction'] = {
-            'features': available_features,
-            'best_model': list(results.keys())[list(results.values()).index(max(results.values(), key=lambda x: x['r2']))],
-            'performance': results,
-            'trained_date': datetime.now().isoformat()
-        }
-        
-        # Feature importance
-        if hasattr(best_model, 'feature_importances_'):
-            self.feature_importance['stock_prediction'] = dict(zip(available_features, best_model.feature_importances_))
+        # Cross-validation only scored clones; fit the winner once on every row
+        self._fit(best_model, X, y)
+        
+        # Store best model; data types may be training on other threads
+        with self._lock:
+            self.models['stock_prediction'] = best_model
+            self.model_metadata['stock_prediction'] = {
+                'features': available_features,
+                'dtype': FEATURE_DTYPE,
+                'feature_means': X.mean(axis=0, dtype=np.float64).astype(FEATURE_DTYPE),
+                'best_model': best_name,
+                'performance': results,
+                'trained_date': datetime.now().isoformat()
+            }
+            
+            # Feature importance
+            if hasattr(best_model, 'feature_importances_'):
+                self.feature_importance['stock_prediction'] = _ranked_importances(available_features, best_model.feature_importances_)
         
         logger.info(f"Stock model trained with R² = {best_score:.3f}")
         return results
@@ -225,89 +336,71 @@ class MLModels:
             return {}
         
         # Prepare features for weather classification
-        feature_cols = [
-            'temperature', 'humidity', 'pressure', 'wind_speed',
-            'temp_fahrenheit', 'hour', 'day_of_week', 'month',
-            'is_summer', 'is_winter', 'is_weekend'
-        ]
-        
-        available_features = [col for col in feature_cols if col in df.columns]
+        available_features = _present(WEATHER_FEATURES, df.columns)
         
         if len(available_features) < 3:
             logger.warning("Insufficient features for weather model")
             return {}
         
         # Target: classify weather conditions
-        df_model = df.copy()
-        
-        # Create weather categories based on temperature and conditions
-        df_model['weather_category'] = pd.cut(
-            df_model['temperature'],
-            bins=[-float('inf'), 0, 15, 25, float('inf')],
-            labels=['Cold', 'Cool', 'Warm', 'Hot']
-        )
+        # Integer temperature bands, named through WEATHER_CATEGORY_LABELS
+        temps = df['temperature'].to_numpy(dtype=np.float64)
+        y = np.digitize(temps, WEATHER_CATEGORY_EDGES, right=True).astype(np.int8)
+        X = np.ascontiguousarray(df[available_features].to_numpy(dtype=FEATURE_DTYPE))
         
-        df_model = df_model.dropna()
+        keep = ~(np.isnan(X).any(axis=1) | np.isnan(temps))
+        if not keep.all():
+            X, y = X[keep], y[keep]
         
-        if len(df_model) < 10:
+        if len(X) < 10:
             logger.warning("Insufficient data after target creation")
             return {}
         
-        X = df_model[available_features]
-        y = df_model['weather_category']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
-        
         # Train models
         models = {
-            'random_forest': RandomForestClassifier(n_estimators=100, random_state=42),
+            'random_forest': RandomForestClassifier(n_estimators=100, n_jobs=-1, max_samples=0.5, random_state=42),
             'logistic_regression': LogisticRegression(random_state=42),
-            'svc': SVC(random_state=42)
+            'svc': Pipeline([
+                ('scaler', StandardScaler(with_mean=False)),
+                ('svm', LinearSVC(C=1.0, dual='auto', max_iter=5000, random_state=42))
+            ])
         }
         
+        best_name = None
         best_model = None
         best_score = -float('inf')
         results = {}
         
-        for name, model in models.items():
-            try:
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-                
-                accuracy = accuracy_score(y_test, y_pred)
-                
-                results[name] = {
-                    'accuracy': accuracy,
-                    'classification_report': classification_report(y_test, y_pred, output_dict=True)
-                }
-                
-                if accuracy > best_score:
-                    best_score = accuracy
-                    best_model = model
-                    
-            except Exception as e:
-                logger.error(f"Error training {name}: {e}")
-                continue
+        for name, model, metrics in self._score_candidates(models, X, y, partial(_cv_classification_metrics, class_names=WEATHER_CATEGORY_LABELS)):
+            results[name] = metrics
+            if metrics['accuracy'] > best_score:
+                best_score = metrics['accuracy']
+                best_name = name
+                best_model = model
         
         if best_model is None:
             logger.warning("No weather models trained successfully")
             return {}
         
-        # Store best model
-        self.models['weather_classification'] = best_model
-        self.model_metadata['weather_classification'] = {
-            'features': available_features,
-            'best_model': list(results.keys())[list(results.values()).index(max(results.values(), key=lambda x: x['accuracy']))],
-            'performance': results,
-            'trained_date': datetime.now().isoformat()
-        }
-        
-        # Feature importance
-        if hasattr(best_model, 'feature_importances_'):
-            self.feature_importance['weather_classification'] = dict(zip(available_features, best_model.feature_importances_))
+        # Cross-validation only scored clones; fit the winner once on every row
+        self._fit(best_model, X, y)
+        
+        # Store best model; data types may be training on other threads
+        with self._lock:
+            self.models['weather_classification'] = best_model
+            self.model_metadata['weather_classification'] = {
+                'features': available_features,
+                'dtype': FEATURE_DTYPE,
+                'feature_means': X.mean(axis=0, dtype=np.float64).astype(FEATURE_DTYPE),
+                'classes': WEATHER_CATEGORY_LABELS.tolist(),
+                'best_model': best_name,
+                'performance': results,
+                'trained_date': datetime.now().isoformat()
+            }
+            
+            # Feature importance
+            if hasattr(best_model, 'feature_importances_'):
+                self.feature_importance['weather_classification'] = _ranked_importances(available_features, best_model.feature_importances_)
         
         logger.info(f"Weather model trained with accuracy = {best_score:.3f}")
         return results
@@ -317,22 +410,70 @@ class MLModels:
         if model_name not in self.models:
             raise ValueError(f"Model {model_name} not found")
         
-        model = self.models[model_name]
         metadata = self.model_metadata[model_name]
         
         # Select only the features used in training
-        available_features = [col for col in metadata['features'] if col in features.columns]
+        available_features = _present(metadata['features'], features.columns)
         
         if len(available_features) != len(metadata['features']):
             missing_features = set(metadata['features']) - set(available_features)
             logger.warning(f"Missing features for {model_name}: {missing_features}")
         
-        X = features[available_features]
+        # C order matches the kernel's row-by-row scan
+        X = np.array(features[available_features].to_numpy(dtype=metadata.get('dtype')), order='C')
+        
+        # Handle missing values with the training means, so a batch's own statistics never leak in
+        means = metadata.get('feature_means')
+        if means is None:
+            # Models saved before training means were recorded fall back to the batch means
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                means = np.nanmean(X, axis=0)
+        elif len(available_features) != len(metadata['features']):
+            means = means[[metadata['features'].index(col) for col in available_features]]
         
-        # Handle missing values
-        X = X.fillna(X.mean())
+        # Integer matrices cannot hold NaN
+        if X.dtype.kind == 'f':
+            nan_fill(X, means.astype(X.dtype, copy=False))
         
-        return model.predict(X)
+        return self._decode(model_name, self._predict(model_name, X))
+    
+    def predict_array(self, model_name: str, X: np.ndarray) -> np.ndarray:
+        """Make predictions from a 2D array whose columns follow the model's training features"""
+        if model_name not in self.models:
+            raise ValueError(f"Model {model_name} not found")
+        
+        dtype = self.model_metadata.get(model_name, {}).get('dtype')
+        if dtype is not None:
+            X = X.astype(dtype, copy=False)
+        
+        return self._decode(model_name, self._predict(model_name, X))
+    
+    def _predict(self, model_name: str, X: np.ndarray) -> np.ndarray:
+        """Predict from a bare array, quieting the feature-name warning only for legacy models"""
+        model = self.models[model_name]
+        if 'dtype' in self.model_metadata.get(model_name, {}):
+            return model.predict(X)
+        
+        # Models saved without 'dtype' metadata were fitted on DataFrames
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='X does not have valid feature names', category=UserWarning)
+            return model.predict(X)
+    
+    def _decode(self, model_name: str, predictions: np.ndarray) -> np.ndarray:
+        """Map integer class predictions back to their names for classifiers trained on integer labels"""
+        classes = self.model_metadata.get(model_name, {}).get('classes')
+        if classes is None:
+            return predictions
+        return np.asarray(classes)[predictions]
+    
+    def get_feature_importance(self, model_name: str, top_k: Optional[int] = None) -> Dict[str, float]:
+        """Feature importances of a model, most important first, optionally only the top_k"""
+        ranked = self.feature_importance[model_name]
+        if 'importances' not in ranked:
+            # Saved before importances were ranked: a plain {feature: importance} dict
+            ranked = _ranked_importances(list(ranked), list(ranked.values()))
+        return dict(zip(ranked['features'][:top_k].tolist(), ranked['importances'][:top_k].tolist()))
     
     def get_model_summary(self) -> Dict[str, Any]:
         """Get summary of all trained models"""
@@ -359,12 +500,13 @@ class MLModels:
             'feature_importance': self.feature_importance
         }
         
-        joblib.dump(model_data, filepath)
+        # LZ4 shrinks the forest arrays several-fold for little CPU; joblib.load detects it
+        joblib.dump(model_data, filepath, compress=('lz4', 3), protocol=5)
         logger.info(f"Models saved to {filepath}")
     
-    def load_models(self, filepath: str):
-        """Load models and metadata"""
-        model_data = joblib.load(filepath)
+    def load_models(self, filepath: str, mmap_mode: Optional[str] = None):
+        """Load models and metadata, optionally memory-mapping their arrays (uncompressed files only, e.g. mmap_mode='r')"""
+        model_data = joblib.load(filepath, mmap_mode=mmap_mode)
         
         self.models = model_data['models']
         self.model_metadata = model_data['metadata']
@@ -376,16 +518,19 @@ class MLModels:
         """Train models for all available data types"""
         logger.info("Training models for all data types...")
         
-        results = {}
-        
-        if 'covid' in processed_data:
-            results['covid'] = self.train_covid_forecasting_model(processed_data['covid'])
-        
-        if 'stock' in processed_data:
-            results['stock'] = self.train_stock_prediction_model(processed_data['stock'])
+        trainers = {
+            'covid': self.train_covid_forecasting_model,
+            'stock': self.train_stock_prediction_model,
+            'weather': self.train_weather_classification_model
+        }
         
-        if 'weather' in processed_data:
-            results['weather'] = self.train_weather_classification_model(processed_data['weather'])
+        # The data types share no models, so they train side by side
+        with ThreadPoolExecutor(max_workers=len(trainers)) as executor:
+            futures = {
+                data_type: executor.submit(trainer, processed_data[data_type])
+                for data_type, trainer in trainers.items() if data_type in processed_data
+            }
+            results = {data_type: future.result() for data_type, future in futures.items()}
         
         logger.info(f"Trained models for {len(results)} data types")
         return results
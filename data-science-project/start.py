@@ -6,6 +6,9 @@ Orchestrates the entire system including ETL pipeline, backend API, and frontend
 
 import os
 import sys
+import hashlib
+import multiprocessing
+import shutil
 import subprocess
 import time
 import threading
@@ -20,6 +23,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _run_etl(mode, conn):
+    """ETL worker process: run the pipeline in mode and send its status back over conn"""
+    # Default signal handling, so terminate() and Ctrl+C stop the worker itself
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Drop the launcher's log handlers so the pipeline sets up its own, including its log file
+    logging.getLogger().handlers.clear()
+    
+    try:
+        from etl import main as etl_main
+        results = etl_main.run(mode)
+        conn.send({key: results.get(key) for key in ('status', 'errors', 'error')})
+    except Exception as e:
+        conn.send({'status': 'failed', 'error': str(e)})
+    finally:
+        conn.close()
+
 class DataSciencePlatform:
     def __init__(self):
         self.processes = []
@@ -42,28 +62,38 @@ class DataSciencePlatform:
         self.stop_all_processes()
         sys.exit(0)
     
-    def run_etl_pipeline(self):
+    def run_etl_pipeline(self, timeout=300):
         """Run the ETL pipeline to collect and process data"""
         logger.info("Starting ETL pipeline...")
         
         try:
-            # Change to ETL directory and run the pipeline
+            # Change to ETL directory; the pipeline's data paths are relative to it
             os.chdir(self.etl_dir)
             
-            # Run the ETL pipeline
-            result = subprocess.run([
-                sys.executable, "main.py", "--mode", "full"
-            ], capture_output=True, text=True, timeout=300)
+            # Run the pipeline's run() in a child process instead of exec'ing a new interpreter,
+            # so it can still be stopped when it overruns the timeout
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            worker = multiprocessing.Process(target=_run_etl, args=("full", sender))
+            worker.start()
+            sender.close()
+            
+            if not receiver.poll(timeout):
+                worker.terminate()
+                worker.join()
+                logger.error("ETL pipeline timed out")
+                return
             
-            if result.returncode == 0:
+            results = receiver.recv()
+            worker.join()
+            
+            if results.get('status') != 'failed':
                 logger.info("ETL pipeline completed successfully")
-                logger.info(result.stdout)
             else:
                 logger.error("ETL pipeline failed")
-                logger.error(result.stderr)
+                logger.error(results.get('errors') or results.get('error', 'Unknown error'))
                 
-        except subprocess.TimeoutExpired:
-            logger.error("ETL pipeline timed out")
+        except EOFError:
+            logger.error("ETL pipeline exited without reporting a result")
         except Exception as e:
             logger.error(f"Error running ETL pipeline: {e}")
     
@@ -87,9 +117,21 @@ class DataSciencePlatform:
                 pip_path = self.backend_dir / "venv" / "bin" / "pip"
                 python_path = self.backend_dir / "venv" / "bin" / "python"
             
-            # Install requirements
-            logger.info("Installing backend dependencies...")
-            subprocess.run([str(pip_path), "install", "-r", "requirements.txt"])
+            # Install requirements, skipped while requirements.txt matches the last install
+            marker = self.backend_dir / "venv" / ".req_hash"
+            req_hash = hashlib.sha1((self.backend_dir / "requirements.txt").read_bytes()).hexdigest()
+            if marker.exists() and marker.read_text().strip() == req_hash:
+                logger.info("Backend dependencies are up to date")
+            else:
+                logger.info("Installing backend dependencies...")
+                # uv resolves and installs much faster than pip; use it when it is on PATH
+                uv_path = shutil.which("uv")
+                if uv_path:
+                    install = [uv_path, "pip", "install", "-r", "requirements.txt", "--python", str(python_path)]
+                else:
+                    install = [str(pip_path), "install", "-r", "requirements.txt"]
+                if subprocess.run(install).returncode == 0:
+                    marker.write_text(req_hash)
             
             # Start the FastAPI server
             logger.info("Starting FastAPI server on http://localhost:8000")
@@ -124,25 +166,31 @@ class DataSciencePlatform:
         except Exception as e:
             logger.error(f"Error starting frontend: {e}")
     
-    def wait_for_backend(self):
-        """Wait for the backend to be ready"""
+    def wait_for_backend(self, max_wait=60):
+        """Wait up to max_wait seconds for the backend to be ready, polling with exponential backoff"""
         import requests
         
-        max_attempts = 30
-        attempt = 0
+        start = time.monotonic()
+        delay = 0.1
         
-        while attempt < max_attempts and self.running:
-            try:
-                response = requests.get("http://localhost:8000/health", timeout=5)
-                if response.status_code == 200:
-                    logger.info("Backend is ready!")
-                    return True
-            except:
-                pass
-            
-            attempt += 1
-            time.sleep(2)
-            logger.info(f"Waiting for backend... ({attempt}/{max_attempts})")
+        # One keep-alive session, and 127.0.0.1 so no poll waits on resolving localhost
+        with requests.Session() as session:
+            while self.running:
+                try:
+                    response = session.get("http://127.0.0.1:8000/health", timeout=1)
+                    if response.ok:
+                        logger.info("Backend is ready!")
+                        return True
+                except requests.RequestException:
+                    pass
+                
+                elapsed = time.monotonic() - start
+                if elapsed >= max_wait:
+                    break
+                logger.info(f"Waiting for backend... ({elapsed:.1f}s)")
+                time.sleep(min(delay, max_wait - elapsed))
+                # Never poll less often than the old fixed 2s interval
+                delay = min(delay * 2, 2.0)
         
         return False
     